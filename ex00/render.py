@@ -1,29 +1,458 @@
 import sys
 import os
-import settings
+import re
+import ast
+import csv
+import time
+import json
+import hashlib
+import argparse
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
 
+# settings.py se lee junto a este script, sin importarlo
+SETTINGS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'settings.py')
 
-def render(template):
+def escape(value):
+    """
+    Escapes the HTML special characters of a value.
+    :param value: Value to escape, converted to str first.
+    :return: (str) The escaped text.
+    """
+    text = str(value)
+    # Comprobar con 'in' es más rápido que reemplazar cuando no hay nada que escapar
+    if "&" in text or "<" in text or ">" in text or '"' in text or "'" in text:
+        text = text.replace('&', '&amp;')
+        text = text.replace('<', '&lt;')
+        text = text.replace('>', '&gt;')
+        text = text.replace('"', '&quot;')
+        text = text.replace("'", '&#x27;')
+    return text
+
+
+class Template:
+    """
+    Compiled representation of a .template file.
+    The source is tokenized once into literal chunks and placeholder
+    slots, so rendering is a single pass joined at the end.
+    """
+
+    # Un placeholder es un identificador de Python entre llaves, seguido
+    # opcionalmente de filtros: {name}, {name|escape}, {price|0.2f}
+    PLACEHOLDER = re.compile(r'\{([A-Za-z_][A-Za-z0-9_]*)((?:\|[^{}|\s]+)*)\}')
+    # Posible comienzo de un placeholder cortado al final de un bloque
+    PARTIAL = re.compile(r'\{(?:[A-Za-z_][A-Za-z0-9_]*(?:\|[^{}|\s]*)*)?\Z')
+
+    # Filtros con nombre; cualquier otro filtro se usa como formato de format()
+    FILTERS = {
+        'escape': escape,
+        'upper': lambda value: str(value).upper(),
+        'lower': lambda value: str(value).lower(),
+        'title': lambda value: str(value).title(),
+        'strip': lambda value: str(value).strip(),
+    }
+
+    def __init__(self, source):
+        """
+        Constructor for the Template class.
+        :param source: (str) Raw content of the template.
+        """
+        self.parts = []  # Trozos literales y placeholders en orden
+        self.slots = []  # Tuplas (índice en parts, clave, conversión)
+        position = 0
+        for match in Template.PLACEHOLDER.finditer(source):
+            if match.start() > position:
+                self.parts.append(source[position:match.start()])
+            # El placeholder conserva su texto original por si no hay valor
+            convert = Template.compile_filters(match.group(2))
+            self.slots.append((len(self.parts), match.group(1), convert))
+            self.parts.append(match.group(0))
+            position = match.end()
+        if position < len(source):
+            self.parts.append(source[position:])
+
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def compile_filters(filters):
+        """
+        Turns the filters of a placeholder into a single callable.
+        :param filters: (str) Filters as written in the template, e.g. '|0.2f|escape'.
+        :return: Callable converting a value into its rendered text.
+        :raises: ValueError if a filter is neither a named filter nor a
+        format spec valid for a string or a number.
+        """
+        chain = []
+        for name in filters.split('|')[1:]:
+            if name in Template.FILTERS:
+                chain.append(Template.FILTERS[name])
+            else:
+                Template.check_spec(name)
+                chain.append(lambda value, spec=name: format(value, spec))
+        if not chain:
+            return str
+        if len(chain) == 1:
+            single = chain[0]
+            return lambda value: str(single(value))
+
+        def convert(value):
+            for function in chain:
+                value = function(value)
+            return str(value)
+        return convert
+
+    @staticmethod
+    def check_spec(spec):
+        """
+        Checks that a format spec applies to some value, so a mistyped
+        filter name fails when the template is compiled, not when it is
+        rendered.
+        :param spec: (str) The format spec, e.g. '0.2f' or '>10'.
+        :raises: ValueError if no string or number accepts the spec.
+        """
+        for sample in ("", 0, 0.0):
+            try:
+                format(sample, spec)
+                return
+            except (ValueError, TypeError):
+                continue
+        raise ValueError(f"Unknown filter or invalid format spec: {spec}")
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Reads and compiles a template file.
+        :param path: Path to the .template file.
+        :return: (Template) The compiled template.
+        """
+        with open(path, 'r') as file:
+            return cls(file.read())
+
+    @classmethod
+    def from_parts(cls, parts, slots):
+        """
+        Rebuilds a template from an already compiled form.
+        :param parts: (list) Literal chunks and placeholders in order.
+        :param slots: (list) Pairs (index in parts, key).
+        :return: (Template) The compiled template.
+        :raises: ValueError if a pair doesn't point to a placeholder of its key.
+        """
+        template = cls.__new__(cls)
+        template.parts = list(parts)
+        template.slots = []
+        for index, key in slots:
+            match = None
+            if 0 <= index < len(template.parts):
+                match = Template.PLACEHOLDER.fullmatch(template.parts[index])
+            if match is None or match.group(1) != key:
+                raise ValueError("The compiled form doesn't match the placeholders.")
+            # Los filtros se recuperan del texto original del placeholder
+            template.slots.append((index, key, Template.compile_filters(match.group(2))))
+        return template
+
+    @property
+    def layout(self):
+        """
+        Returns the serializable compiled form: (parts, pairs (index, key)).
+        """
+        return self.parts, [(index, key) for index, key, _ in self.slots]
+
+    @property
+    def keys(self):
+        """
+        Returns the set of placeholder keys used by the template.
+        """
+        return {key for _, key, _ in self.slots}
+
+    def render(self, context):
+        """
+        Fills the placeholder slots with the values of context.
+        Placeholders without a value are left untouched.
+        :param context: (dict) Mapping of placeholder keys to values.
+        :return: (str) The rendered content.
+        """
+        parts = self.parts[:]
+        for index, key, convert in self.slots:
+            if key in context:
+                parts[index] = convert(context[key])
+        return "".join(parts)
+
+
+def render_stream(source, output, context, chunk_size=1 << 16):
+    """
+    Renders a template incrementally, reading it in chunks and writing
+    each rendered chunk straight to the output, so memory stays flat
+    whatever the size of the template. Placeholders split between two
+    chunks are carried over to the next one.
+    :param source: Text file object opened on the template.
+    :param output: Text file object the result is written to.
+    :param context: (dict) Mapping of placeholder keys to values.
+    :param chunk_size: (int) Number of characters read at once.
+    """
+    def replace(match):
+        key = match.group(1)
+        # Los filtros se comprueban aunque no haya valor, como al compilar la plantilla
+        convert = Template.compile_filters(match.group(2))
+        if key not in context:
+            return match.group(0)
+        return convert(context[key])
+
+    pending = ""
+    while True:
+        chunk = source.read(chunk_size)
+        data = pending + chunk
+        pending = ""
+        if chunk:
+            # Guardar para el siguiente bloque un placeholder incompleto
+            partial = Template.PARTIAL.search(data, max(0, data.rfind('{')))
+            if partial:
+                data, pending = data[:partial.start()], data[partial.start():]
+        output.write(Template.PLACEHOLDER.sub(replace, data))
+        if not chunk:
+            break
+
+
+class TemplateCache:
+    """
+    Bounded LRU cache of compiled templates keyed by path.
+    Entries are invalidated when the mtime, size or content hash
+    of the template file changes. Optionally, the compiled form is
+    also stored on disk next to the template (<template>.cache).
+    """
+
+    def __init__(self, maxsize=64, disk=False):
+        """
+        Constructor for the TemplateCache class.
+        :param maxsize: (int) Maximum number of templates kept in memory.
+        :param disk: (bool) If True, read and write the on-disk cache.
+        """
+        if maxsize < 1:
+            raise ValueError("The cache size must be at least 1.")
+        self.maxsize = maxsize
+        self.disk = disk
+        # Ruta -> (mtime_ns, tamaño, hash, Template)
+        self.entries = OrderedDict()
+
+    def get(self, path):
+        """
+        Returns the compiled template for path, compiling it only
+        when the cached entry is missing or stale.
+        :param path: Path to the .template file.
+        :return: (Template) The compiled template.
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        entry = self.entries.get(key)
+        if entry is None and self.disk:
+            entry = self._load(key)
+        if entry is not None and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+            self._store(key, entry)
+            return entry[3]
+
+        with open(key, 'rb') as file:
+            raw = file.read()
+        digest = hashlib.sha256(raw).hexdigest()
+        # Si solo ha cambiado la fecha, el contenido sigue siendo válido
+        if entry is not None and entry[2] == digest:
+            template = entry[3]
+        else:
+            template = Template(raw.decode())
+        entry = (stat.st_mtime_ns, stat.st_size, digest, template)
+        self._store(key, entry)
+        if self.disk:
+            self._dump(key, entry)
+        return template
+
+    def clear(self):
+        """
+        Removes every template from the in-memory cache.
+        """
+        self.entries.clear()
+
+    def _store(self, key, entry):
+        """
+        Saves an entry as the most recently used one, evicting the
+        least recently used entry when the cache is full.
+        """
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    @staticmethod
+    def _load(key):
+        """
+        Reads the on-disk cache of a template, if any.
+        :return: The cache entry, or None if missing or unreadable.
+        """
+        try:
+            with open(key + '.cache', 'r') as file:
+                data = json.load(file)
+            template = Template.from_parts(data['parts'], data['slots'])
+            return data['mtime_ns'], data['size'], data['sha256'], template
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    @staticmethod
+    def _dump(key, entry):
+        """
+        Writes the compiled form of a template next to it.
+        Failing to write the cache never prevents rendering.
+        """
+        mtime_ns, size, digest, template = entry
+        parts, slots = template.layout
+        data = {
+            'mtime_ns': mtime_ns,
+            'size': size,
+            'sha256': digest,
+            'parts': parts,
+            'slots': slots,
+        }
+        try:
+            with open(key + '.cache', 'w') as file:
+                json.dump(data, file)
+        except OSError:
+            pass
+
+
+# Caché compartida por todas las llamadas a render() del proceso
+template_cache = TemplateCache()
+
+
+class Settings(dict):
+    """
+    Every value defined in a settings file, including the ones that
+    are not literals: reading one of those raises ValueError, as
+    SettingsLoader.load() does when it is requested.
+    """
+
+    def __getitem__(self, name):
+        value = super().__getitem__(name)
+        if value is SettingsLoader.NOT_LITERAL:
+            raise ValueError(f"The setting {name} is not a literal value.")
+        return value
+
+
+class SettingsLoader:
+    """
+    Reads plain settings files (NAME = <literal>) without executing
+    them, so their imports and helpers never run. Each file is parsed
+    once per mtime/size and only the requested keys are returned.
+    """
+
+    # Marca de un valor que no es un literal de Python
+    NOT_LITERAL = object()
+
+    def __init__(self):
+        """
+        Constructor for the SettingsLoader class.
+        """
+        self.entries = {}  # Ruta -> ((mtime_ns, tamaño), {clave: valor})
+
+    def load(self, path=SETTINGS_FILE, keys=None):
+        """
+        Returns the values defined in a settings file.
+        :param path: Path to the settings file (settings.py by default).
+        :param keys: Iterable of the keys to return. All the literal
+        ones if None.
+        :return: (dict) Public variables of the file.
+        :raises: ValueError if a requested key is not a literal value.
+        """
+        values = self._values(path)
+        if keys is None:
+            # Sin claves pedidas se omiten los valores que no son literales
+            return {name: value for name, value in values.items()
+                    if value is not SettingsLoader.NOT_LITERAL}
+        context = {}
+        for name in keys:
+            if name not in values:
+                continue
+            if values[name] is SettingsLoader.NOT_LITERAL:
+                raise ValueError(f"The setting {name} is not a literal value.")
+            context[name] = values[name]
+        return context
+
+    def settings(self, path=SETTINGS_FILE):
+        """
+        Returns the values of a settings file for a template whose keys
+        are not known in advance: a value that is not a literal raises
+        ValueError only when it is read.
+        :param path: Path to the settings file (settings.py by default).
+        :return: (Settings) Public variables of the file.
+        """
+        return Settings(self._values(path))
+
+    def _values(self, path):
+        """
+        Returns the parsed values of a settings file, parsing it again
+        only when its mtime or size changes.
+        """
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self.entries.get(key)
+        if entry is None or entry[0] != signature:
+            with open(key, 'r') as file:
+                entry = (signature, self.parse(file.read()))
+            self.entries[key] = entry
+        return entry[1]
+
+    @staticmethod
+    def parse(source):
+        """
+        Collects the top-level assignments of a settings file.
+        Values that are not literals are marked with NOT_LITERAL.
+        :param source: (str) Content of the settings file.
+        :return: (dict) Public names mapped to their values.
+        """
+        values = {}
+        for node in ast.parse(source).body:
+            if isinstance(node, ast.Assign):
+                targets, value = node.targets, node.value
+            elif isinstance(node, ast.AnnAssign) and node.value is not None:
+                targets, value = [node.target], node.value
+            else:
+                continue
+            try:
+                value = ast.literal_eval(value)
+            except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+                # Por ejemplo un nombre, una llamada o {[1], 2} (no hashable)
+                value = SettingsLoader.NOT_LITERAL
+            for target in targets:
+                if isinstance(target, ast.Name) and not target.id.startswith("__"):
+                    values[target.id] = value
+        return values
+
+
+# Lector compartido, con los ficheros ya analizados en memoria
+settings_loader = SettingsLoader()
+
+
+def render(template, stream=False):
     """
     Processes a template file (.template), replacing variables
     defined in settings.py, and generates an HTML file with the
     final content.
     :param template: Name of the template file to process.
+    :param stream: (bool) If True, the template is read and written
+    chunk by chunk instead of being loaded in memory.
     """
     try:
-        # Leer el contenido del archivo .template
-        with open(template, 'r') as file:
-            content = file.read()
-
-        # Reemplazar las variables con los valores definidos en settings.py
-        for key, value in vars(settings).items():
-            if not key.startswith("__"):
-                content = content.replace(f'{{{key}}}', str(value))
-
         # Crear el archivo de salida con extensión .html
         output_file = template.replace('.template', '.html')
-        with open(output_file, 'w') as file:
-            file.write(content)
+
+        if stream:
+            # Leer, rellenar y escribir la plantilla por bloques
+            with open(template, 'r') as source, open(output_file, 'w') as file:
+                # Las claves usadas no se conocen de antemano: se comprueban al leerlas
+                render_stream(source, file, settings_loader.settings())
+        else:
+            # Compilar la plantilla y rellenarla solo con las claves que usa
+            compiled = template_cache.get(template)
+            content = compiled.render(settings_loader.load(keys=compiled.keys))
+            with open(output_file, 'w') as file:
+                file.write(content)
 
         print(f"File successfully generated: {output_file}")
 
@@ -32,18 +461,259 @@ def render(template):
         print(f"Error processing the template: {e}")
 
 
+def read_records(path, fmt=None):
+    """
+    Lazily reads the settings records of a batch, one person per row.
+    :param path: Path to a JSON Lines (.jsonl) or CSV (.csv) file.
+    :param fmt: (str) 'jsonl' or 'csv'. Guessed from the extension if None.
+    :return: Generator of dicts, one per record.
+    """
+    if fmt is None:
+        fmt = 'csv' if path.endswith('.csv') else 'jsonl'
+    if fmt not in ('jsonl', 'csv'):
+        raise ValueError(f"Unknown records format: {fmt}")
+    with open(path, 'r', newline='') as file:
+        if fmt == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {number}: a record must be a JSON object.")
+            yield record
+
+
+# Estado de cada proceso del pool, fijado una sola vez en _init_worker()
+_batch_template = None
+_batch_defaults = None
+
+
+def _init_worker(parts, slots, defaults):
+    """
+    Initializes a batch worker with the compiled template, so it is
+    sent once per process instead of once per record.
+    """
+    global _batch_template, _batch_defaults
+    _batch_template = Template.from_parts(parts, slots)
+    _batch_defaults = defaults
+
+
+def _render_chunk(chunk):
+    """
+    Renders a chunk of (output_file, record) pairs in a worker.
+    :return: (int) Number of files written.
+    """
+    for output_file, record in chunk:
+        context = dict(_batch_defaults)
+        context.update(record)
+        with open(output_file, 'w') as file:
+            file.write(_batch_template.render(context))
+    return len(chunk)
+
+
+def render_batch(template, records, output_dir, workers=None, chunksize=64, name_key=None):
+    """
+    Renders one template for many settings records, writing one .html
+    file per record. Values missing from a record fall back to settings.py.
+    :param template: Path to the .template file.
+    :param records: Iterable of dicts, one per record.
+    :param output_dir: Directory where the .html files are written.
+    :param workers: (int) Number of worker processes (CPU count if None).
+    With 1 worker the records are rendered in this process.
+    :param chunksize: (int) Number of records sent to a worker at once.
+    :param name_key: (str) Record field used to name each output file.
+    By default files are numbered in the order of the records.
+    :return: (int) Number of files written.
+    """
+    if chunksize < 1:
+        raise ValueError("The chunk size must be at least 1.")
+    compiled = template_cache.get(template)
+    stem = os.path.splitext(os.path.basename(template))[0]
+    os.makedirs(output_dir, exist_ok=True)
+
+    def named_records():
+        for index, record in enumerate(records, 1):
+            name = f"{stem}_{index}" if name_key is None else str(record[name_key])
+            yield os.path.join(output_dir, os.path.basename(name) + '.html'), record
+
+    jobs = named_records()
+    chunks = iter(lambda: list(islice(jobs, chunksize)), [])
+    initargs = (*compiled.layout, settings_loader.load(keys=compiled.keys))
+
+    if workers == 1:
+        _init_worker(*initargs)
+        return sum(_render_chunk(chunk) for chunk in chunks)
+
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=initargs) as executor:
+        # Limitar los trozos en vuelo para no cargar todo el flujo en memoria
+        limit = 2 * workers
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= limit:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                written += sum(future.result() for future in done)
+            pending.add(executor.submit(_render_chunk, chunk))
+        written += sum(future.result() for future in pending)
+    return written
+
+
+class Watcher:
+    """
+    Watches a directory of .template files and the settings module by
+    polling their stat, and re-renders only the outputs affected by a
+    change. An index from each template to the placeholder keys it uses
+    decides which outputs depend on a changed setting.
+    """
+
+    def __init__(self, directory, settings_file=None):
+        """
+        Constructor for the Watcher class.
+        :param directory: Directory holding the .template files.
+        :param settings_file: Path to the settings module (settings.py by default).
+        """
+        self.directory = directory
+        self.settings_file = settings_file or SETTINGS_FILE
+        self.settings_stat = None
+        self.context = {}
+        self.templates = {}  # Ruta -> (mtime_ns, tamaño)
+        self.index = {}  # Ruta -> claves usadas por la plantilla
+
+    def poll(self):
+        """
+        Checks the watched files once and re-renders what changed.
+        A settings file or a template that cannot be read or rendered
+        (e.g. while it is being edited) is reported and skipped until
+        it changes again.
+        :return: (list) Paths of the .html files written.
+        """
+        dirty = set()
+
+        stat = self._stat(self.settings_file)
+        if stat != self.settings_stat:
+            self.settings_stat = stat
+            try:
+                # Un valor que no es literal falla al renderizar las plantillas
+                # que lo usan, como en render() y --batch
+                context = settings_loader.settings(self.settings_file)
+            except Exception as e:
+                # Se conservan los valores anteriores hasta el próximo cambio
+                print(f"Error reading the settings: {e}")
+                context = self.context
+            missing = object()
+            changed = {key for key in context.keys() | self.context.keys()
+                       if dict.get(context, key, missing) != dict.get(self.context, key, missing)}
+            self.context = context
+            # Solo las plantillas que usan alguna clave modificada
+            dirty.update(path for path, keys in self.index.items() if keys & changed)
+
+        current = set()
+        for name in os.listdir(self.directory):
+            if not name.endswith('.template'):
+                continue
+            path = os.path.join(self.directory, name)
+            stat = self._stat(path)
+            if stat is None:
+                continue
+            current.add(path)
+            if self.templates.get(path) != stat:
+                self.templates[path] = stat
+                dirty.add(path)
+        # Olvidar las plantillas borradas
+        for path in self.templates.keys() - current:
+            del self.templates[path]
+            self.index.pop(path, None)
+            dirty.discard(path)
+
+        written = []
+        for path in sorted(dirty):
+            output_file = path.replace('.template', '.html')
+            try:
+                template = template_cache.get(path)
+                self.index[path] = template.keys
+                content = template.render(self.context)
+                with open(output_file, 'w') as file:
+                    file.write(content)
+            except Exception as e:
+                print(f"Error processing the template {path}: {e}")
+                continue
+            written.append(output_file)
+        return written
+
+    def run(self, interval=0.5):
+        """
+        Polls the watched files forever, until interrupted. Errors are
+        printed and the next poll goes on.
+        :param interval: (float) Seconds between two polls.
+        """
+        while True:
+            try:
+                for output_file in self.poll():
+                    print(f"File successfully generated: {output_file}")
+            except Exception as e:
+                # Un error en una comprobación no detiene la vigilancia
+                print(f"Error watching the templates: {e}")
+            time.sleep(interval)
+
+    @staticmethod
+    def _stat(path):
+        """
+        Returns the (mtime_ns, size) signature of a file, or None if missing.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
 def main():
     """
     Main script function.
     Ensures a template file is passed as an argument,
     validates its existence and extension, and calls the render() function.
     """
-    # Validar que el usuario pase el archivo de plantilla como argumento
-    if len(sys.argv) != 2:
-        print("Usage: python render.py <template_file>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(usage="python render.py [options] <template_file>")
+    parser.add_argument("template", help="template file to render (a directory with --watch)")
+    parser.add_argument("--cache", action="store_true",
+                        help="store the compiled template next to it (<template>.cache)")
+    parser.add_argument("--stream", action="store_true",
+                        help="render large templates chunk by chunk")
+    batch = parser.add_argument_group("batch mode")
+    batch.add_argument("--batch", metavar="RECORDS",
+                       help="render one .html per record of a .jsonl or .csv file")
+    batch.add_argument("--format", choices=("jsonl", "csv"),
+                       help="format of the records file (guessed from its extension)")
+    batch.add_argument("--output-dir", default=".",
+                       help="directory for the batch .html files")
+    batch.add_argument("--workers", type=int, help="number of worker processes")
+    batch.add_argument("--chunksize", type=int, default=64,
+                       help="records sent to a worker at once")
+    batch.add_argument("--name-key", help="record field used to name each .html file")
+    watch = parser.add_argument_group("watch mode")
+    watch.add_argument("--watch", action="store_true",
+                       help="re-render the templates of a directory when they or settings.py change")
+    watch.add_argument("--interval", type=float, default=0.5,
+                       help="seconds between two checks of the watched files")
+    args = parser.parse_args()
 
-    template = sys.argv[1]
+    template = args.template
+    template_cache.disk = args.cache
+
+    if args.watch:
+        # Vigilar un directorio de plantillas hasta que se interrumpa
+        if not os.path.isdir(template):
+            print(f"Error: The directory {template} does not exist.")
+            sys.exit(1)
+        try:
+            Watcher(template).run(args.interval)
+        except KeyboardInterrupt:
+            pass
+        return
 
     # Comprobar si el archivo existe
     if not os.path.isfile(template):
@@ -55,8 +725,20 @@ def main():
         print("Error: The file must have a .template extension")
         sys.exit(1)
 
+    if args.batch is not None:
+        # Renderizar un .html por registro en paralelo
+        try:
+            records = read_records(args.batch, args.format)
+            count = render_batch(template, records, args.output_dir, args.workers,
+                                 args.chunksize, args.name_key)
+        except Exception as e:
+            print(f"Error processing the batch: {e}")
+            sys.exit(1)
+        print(f"{count} files successfully generated in {args.output_dir}")
+        return
+
     # Procesar el archivo de plantilla
-    render(template)
+    render(template, stream=args.stream)
 
 
 if __name__ == "__main__":
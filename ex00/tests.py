@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# coding: utf-8
+
+import io
+import os
+import json
+import time
+import tempfile
+import traceback
+from itertools import count
+from render import (Template, TemplateCache, SettingsLoader, Watcher, render_stream,
+                    render_batch, read_records)
+
+
+# Fechas de modificación crecientes, aunque el sistema de archivos sea poco preciso
+clock = count(time.time_ns(), 10 ** 9)
+
+
+def touch(path):
+    os.utime(path, ns=(time.time_ns(), next(clock)))
+
+
+def write(path, content):
+    with open(path, 'w') as file:
+        file.write(content)
+    touch(path)
+
+
+def read(path):
+    with open(path) as file:
+        return file.read()
+
+
+def test_template():
+    template = Template('<p>{name}</p><p>{missing}</p>')
+    # Values are filled in, unknown placeholders are left untouched :
+    assert template.render({'name': 'Ada'}) == '<p>Ada</p><p>{missing}</p>'
+    assert template.keys == {'name', 'missing'}
+    # Text that isn't a placeholder is kept as is :
+    assert Template('a { b } {1} {}').render({'b': 'x'}) == 'a { b } {1} {}'
+    # The compiled form can be rebuilt :
+    parts, slots = template.layout
+    assert Template.from_parts(parts, slots).render({'name': 'Bob'}) == template.render({'name': 'Bob'})
+    print('Template behaviour : OK.')
+
+
+def test_filters():
+    context = {'name': '  <Ada> ', 'price': 3.14159, 'count': 7}
+    assert Template('{name|escape}').render(context) == '  &lt;Ada&gt; '
+    # Filters are applied from left to right :
+    assert Template('{name|strip|upper|escape}').render(context) == '&lt;ADA&gt;'
+    assert Template('{name|escape|strip|lower}').render(context) == '&lt;ada&gt;'
+    # Any other filter is a format spec :
+    assert Template('{price|0.2f}').render(context) == '3.14'
+    assert Template('{count|03d}|{count|>3}').render(context) == '007|  7'
+    assert Template('{price|0.1f|>6}').render(context) == '   3.1'
+    # A mistyped filter fails when the template is compiled :
+    try:
+        Template('{name|escpae}')
+        raise(Exception("incorrect behaviour."))
+    except Exception as e:
+        assert isinstance(e, ValueError)
+    # ... and when streamed, even without a value for it :
+    try:
+        render_stream(io.StringIO('{missing|escpae}'), io.StringIO(), context)
+        raise(Exception("incorrect behaviour."))
+    except Exception as e:
+        assert isinstance(e, ValueError)
+    print('Filter chains : OK.')
+
+
+def test_render_stream():
+    source = ('<h1>{name|upper}</h1>{ not a placeholder }'
+              + '<p>{surname}, {price|0.2f} {missing|escape}</p>{name}' * 3 + '{')
+    context = {'name': 'Ada', 'surname': 'Lovelace', 'price': 2.5}
+    expected = Template(source).render(context)
+    # Placeholders cut between two chunks are carried over to the next one :
+    for chunk_size in list(range(1, 40)) + [len(source), 1 << 16]:
+        output = io.StringIO()
+        render_stream(io.StringIO(source), output, context, chunk_size)
+        assert output.getvalue() == expected, chunk_size
+    print('Streaming render : OK.')
+
+
+def test_template_cache():
+    with tempfile.TemporaryDirectory() as folder:
+        first, second = os.path.join(folder, 'a.template'), os.path.join(folder, 'b.template')
+        write(first, 'Hi {name}')
+        write(second, 'Bye {name}')
+        cache = TemplateCache(maxsize=1)
+        template = cache.get(first)
+        # The same compiled template while the file doesn't change :
+        assert cache.get(first) is template
+        # A new mtime with the same content keeps it :
+        touch(first)
+        assert cache.get(first) is template
+        # A new content compiles it again :
+        write(first, 'Hello {name}!')
+        template = cache.get(first)
+        assert template.render({'name': 'Ada'}) == 'Hello Ada!'
+        # The least recently used template is evicted :
+        cache.get(second)
+        assert list(cache.entries) == [os.path.abspath(second)]
+        assert cache.get(first) is not template
+
+        # The compiled form can be kept on disk, next to the template :
+        TemplateCache(disk=True).get(first)
+        assert os.path.isfile(first + '.cache')
+        with open(first + '.cache') as file:
+            assert json.load(file)['parts'] == template.parts
+        assert TemplateCache(disk=True).get(first).render({'name': 'Bob'}) == 'Hello Bob!'
+        # An unreadable cache file is ignored :
+        write(first + '.cache', '{')
+        assert TemplateCache(disk=True).get(first).render({'name': 'Eve'}) == 'Hello Eve!'
+        # ... and so is one whose layout doesn't match its parts :
+        with open(first + '.cache') as file:
+            data = json.load(file)
+        for slots in ([[0, 'name']], [[9, 'name']], [[1, 'other']], [[-1, 'name']]):
+            with open(first + '.cache', 'w') as file:
+                json.dump(dict(data, slots=slots), file)
+            assert TemplateCache(disk=True).get(first).render({'name': 'Eve'}) == 'Hello Eve!'
+    try:
+        TemplateCache(maxsize=0)
+        raise(Exception("incorrect behaviour."))
+    except Exception as e:
+        assert isinstance(e, ValueError)
+    print('Template cache : OK.')
+
+
+def test_settings_loader():
+    values = SettingsLoader.parse('import os\n'
+                                  'name = "Ada"\n'
+                                  'year: int = 1843\n'
+                                  'skills = ["math", "poetry"]\n'
+                                  'path = os.getcwd()\n'
+                                  'bad = {[1], 2}\n'
+                                  '__hidden__ = 1\n')
+    assert (values['name'], values['year'], values['skills']) == ('Ada', 1843, ['math', 'poetry'])
+    assert values['path'] is SettingsLoader.NOT_LITERAL and values['bad'] is SettingsLoader.NOT_LITERAL
+    assert '__hidden__' not in values and 'os' not in values
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'settings.py')
+        write(path, 'name = "Ada"\nbad = {[1], 2}\n')
+        loader = SettingsLoader()
+        # Non-literal values are skipped, or rejected when requested :
+        assert loader.load(path) == {'name': 'Ada'}
+        assert loader.load(path, keys=['name', 'missing']) == {'name': 'Ada'}
+        try:
+            loader.load(path, keys=['bad'])
+            raise(Exception("incorrect behaviour."))
+        except Exception as e:
+            assert isinstance(e, ValueError)
+        # ... or when read, if the keys aren't known in advance :
+        settings = loader.settings(path)
+        assert 'bad' in settings and settings['name'] == 'Ada'
+        try:
+            settings['bad']
+            raise(Exception("incorrect behaviour."))
+        except Exception as e:
+            assert isinstance(e, ValueError)
+        # A changed file is parsed again :
+        write(path, 'name = "Bob"\n')
+        assert loader.load(path) == {'name': 'Bob'}
+    print('Settings loader : OK.')
+
+
+def test_batch():
+    with tempfile.TemporaryDirectory() as folder:
+        template = os.path.join(folder, 'card.template')
+        write(template, '{name} {surname}')
+        records = os.path.join(folder, 'people.jsonl')
+        write(records, '{"name": "Ann", "id": "a"}\n\n{"name": "Bob", "surname": "Smith", "id": "b"}\n')
+        # Missing values fall back to settings.py :
+        written = render_batch(template, read_records(records), os.path.join(folder, 'out'),
+                               workers=1, chunksize=1, name_key='id')
+        assert written == 2
+        assert read(os.path.join(folder, 'out', 'a.html')) == 'Ann Lovelace'
+        assert read(os.path.join(folder, 'out', 'b.html')) == 'Bob Smith'
+        # CSV records, numbered files :
+        csv_records = os.path.join(folder, 'people.csv')
+        write(csv_records, 'name,surname\nAnn,Lee\n')
+        assert list(read_records(csv_records)) == [{'name': 'Ann', 'surname': 'Lee'}]
+        render_batch(template, read_records(csv_records), folder, workers=1)
+        assert read(os.path.join(folder, 'card_1.html')) == 'Ann Lee'
+    print('Batch rendering : OK.')
+
+
+def test_watch():
+    with tempfile.TemporaryDirectory() as folder:
+        settings = os.path.join(folder, 'settings.py')
+        write(settings, 'name = "Ada"\nyear = 1843\n')
+        first, second = os.path.join(folder, 'a.template'), os.path.join(folder, 'b.template')
+        write(first, '{name}')
+        write(second, '{year}')
+        watcher = Watcher(folder, settings)
+        assert sorted(watcher.poll()) == [os.path.join(folder, 'a.html'), os.path.join(folder, 'b.html')]
+        assert watcher.poll() == []
+        # Only the templates using a changed setting are rendered again :
+        write(settings, 'name = "Bob"\nyear = 1843\n')
+        assert watcher.poll() == [os.path.join(folder, 'a.html')]
+        assert read(os.path.join(folder, 'a.html')) == 'Bob'
+        # Errors are reported and the watch goes on :
+        write(settings, 'name = (\n')
+        write(second, '{year|bad}')
+        assert watcher.poll() == []
+        write(settings, 'name = "Eve"\nyear = 1843\n')
+        write(second, '{year|>5}')
+        assert sorted(watcher.poll()) == [os.path.join(folder, 'a.html'), os.path.join(folder, 'b.html')]
+        assert read(os.path.join(folder, 'b.html')) == ' 1843'
+        # A value that isn't a literal is an error, as when rendering once :
+        write(settings, 'import os\nname = os.getcwd()\nyear = 1843\n')
+        assert watcher.poll() == []
+        assert read(os.path.join(folder, 'a.html')) == 'Eve'
+        write(settings, 'name = "Ann"\nyear = 1843\n')
+        assert watcher.poll() == [os.path.join(folder, 'a.html')]
+        assert read(os.path.join(folder, 'a.html')) == 'Ann'
+    print('Watch mode : OK.')
+
+
+def test():
+    test_template()
+    test_filters()
+    test_render_stream()
+    test_template_cache()
+    test_settings_loader()
+    test_batch()
+    test_watch()
+
+if __name__ == '__main__':
+    try :
+        test()
+        print('Tests succeeded!')
+    except AssertionError as e:
+        traceback.print_exc()
+        print(e)
+        print('Tests failed!')
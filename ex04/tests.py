@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 # coding: utf-8
 
+import io
+import weakref
 import traceback
-from elem import Elem, Text
+from elem import Elem, Text, NodeStore, LazyContent
 
 
 def test_text():
@@ -20,6 +22,14 @@ def test_text():
     assert str(Text('<')) == '&lt;'
     assert str(Text('>')) == '&gt;'
     assert str(Text('"')) == '&quot;'
+    # The escaped form isn't stored on the instance :
+    text = Text('a < b')
+    assert str(text) == 'a &lt; b' and not vars(text)
+    assert type(str(Text('plain'))) is str
+    # Many strings at once :
+    assert Text.escape_many(['<', 'a\0b', 'a&b\n']) == ['&lt;', 'a\0b', 'a&amp;b\n<br />\n']
+    assert Text.escape_many(['"x"', Text('>')]) == ['&quot;x&quot;', '&gt;']
+    assert Text.escape_many([]) == []
     print('Text behaviour : OK.')
 
     
@@ -39,11 +49,40 @@ def test_elem_basics():
     print('Basic Elem behaviour : OK.')
 
     
+def test_attributes():
+    # Values are escaped, keys are sorted :
+    assert (str(Elem('a', {'title': 'Tom & "Jerry"', 'href': '/?a=1&b=2'}))
+            == '<a href="/?a=1&amp;b=2" title="Tom &amp; &#34;Jerry&#34;"></a>')
+    assert (str(Elem('p', content=Elem('a', {'title': '"x"'}, Text('"y"'))))
+            == '<p>\n  <a title="&#34;x&#34;">\n    "y"\n  </a>\n</p>')
+    # Equal keys of a dict aren't written the same :
+    values = [1, True, 1.0, '1']
+    rendered = ['<td data-x="1"></td>', '<td data-x="True"></td>', '<td data-x="1.0"></td>',
+                '<td data-x="1"></td>']
+    assert [str(Elem('td', {'data-x': value})) for value in values] == rendered
+    store = NodeStore()
+    for value in values:
+        store.append(Elem('td', {'data-x': value}))
+    flat = Elem('tr')
+    flat.content = store
+    assert str(flat) == '<tr>\n  ' + '\n  '.join(rendered) + '\n</tr>'
+    assert [elem.attr['data-x'] for elem in store] == values
+    assert [type(elem.attr['data-x']) for elem in store] == [int, bool, float, str]
+    print('Attributes : OK.')
+
+
 def test_empty_texts():
     assert str(Elem(content=Text(''))) == '<div></div>'
     assert str(Elem(content=[Text(''), Text('')])) == '<div></div>'
     assert str(Elem(content=[Text('foo'), Text(''), Elem()])) == '<div>\n  foo\
 \n  <div></div>\n</div>'
+    # Texts added one by one keep nothing on the instance :
+    text = Text('a & b')
+    elem = Elem(content=text)
+    elem.add_content(Text(' '))
+    str(elem)
+    assert not vars(text) and len(elem.content) == 1
+    assert str(Elem(content=Text('\n'))) == '<div>\n  <br />\n</div>'
     print('Elem with empty texts : OK.')
 
     
@@ -109,10 +148,235 @@ def test_embedding():
     print('Element embedding : OK.')
 
 
+def test_deep_embedding():
+    # Deeper than the recursion limit :
+    depth = 2000
+    elem = Elem(content=Text('"deep"'))
+    for _ in range(depth - 1):
+        elem = Elem(content=elem)
+    lines = (['  ' * i + '<div>' for i in range(depth)]
+             + ['  ' * depth + '"deep"']
+             + ['  ' * i + '</div>' for i in reversed(range(depth))])
+    assert str(elem) == '\n'.join(lines)
+    print('Deep element embedding : OK.')
+
+
+def test_streaming():
+    elem = Elem('body', {'id': 'main'}, [
+        Text('intro'),
+        Elem('ul', content=[Elem('li', content=Text(str(i))) for i in range(3)]),
+        Elem('img', {'src': 'a.png'}, tag_type='simple'),
+    ])
+    # The fragments make up the same document as str() :
+    assert ''.join(elem.iter_html()) == str(elem)
+    fp = io.StringIO()
+    elem.write_to(fp)
+    assert fp.getvalue() == str(elem)
+    print('Streaming output : OK.')
+
+
+def test_node_store():
+    tree = [
+        Elem('p', {'class': 'x'}, [Text('a\nb'), Text(' '), Elem('br', tag_type='simple')]),
+        Text('"quoted"'),
+        Elem('ul', content=[Elem('li', content=Text(i)) for i in range(3)]),
+        Elem('span'),
+    ]
+    store = NodeStore()
+    for node in tree:
+        store.append(node)
+    flat = Elem('body')
+    flat.content = store
+    # Same HTML as the object tree :
+    assert str(flat) == str(Elem('body', content=tree))
+    # Iterating builds the objects back :
+    assert len(store) == 4
+    built = Elem('body', content=list(store))
+    assert str(built) == str(flat)
+    # Built children know their parent, so edits reach the cached HTML :
+    built.content[2].content[0].add_content(Elem('b', content=Text('new')))
+    built.content[2].content[1].attr = {'id': 'second'}
+    assert str(built) == str(Elem('body', content=[
+        Elem('p', {'class': 'x'}, [Text('a\nb'), Elem('br', tag_type='simple')]),
+        Text('"quoted"'),
+        Elem('ul', content=[Elem('li', content=[Text(0), Elem('b', content=Text('new'))]),
+                            Elem('li', {'id': 'second'}, Text(1)), Elem('li', content=Text(2))]),
+        Elem('span'),
+    ]))
+    # Nodes are added in document order, to an element still open :
+    store = NodeStore()
+    first = store.add_elem(Elem, 'ul', None, 'double')
+    store.add_text('one', store.add_elem(Elem, 'li', None, 'double', first))
+    second = store.add_elem(Elem, 'ul', None, 'double')
+    for parent in (first, store.add_elem(Elem, 'br', None, 'simple', second)):
+        try:
+            store.add_elem(Elem, 'li', None, 'double', parent)
+            raise(Exception("incorrect behaviour."))
+        except Exception as e:
+            assert isinstance(e, Elem.ValidationError)
+    store.add_text('two', store.add_elem(Elem, 'li', None, 'double', second))
+    assert str(Elem('body', content=list(store))) == str(Elem('body', content=[
+        Elem('ul', content=Elem('li', content=Text('one'))),
+        Elem('ul', content=[Elem('br', tag_type='simple'), Elem('li', content=Text('two'))]),
+    ]))
+    print('Flat node store : OK.')
+
+
+def test_from_rows():
+    # Same NodeStore content as the tables of Table.from_rows() :
+    store = NodeStore()
+    header = store.add_elem(Elem, 'tr', None, 'double')
+    store.add_text('Name', store.add_elem(Elem, 'th', None, 'double', header))
+    for name in ('Ann', 'Bob'):
+        row = store.add_elem(Elem, 'tr', None, 'double')
+        store.add_text(name, store.add_elem(Elem, 'td', None, 'double', row))
+    table = Elem('table')
+    table.content = store
+    rows = [Elem('tr', content=Elem('th', content=Text('Name')))]
+    rows += [Elem('tr', content=Elem('td', content=Text(name))) for name in ('Ann', 'Bob')]
+    assert str(table) == str(Elem('table', content=rows))
+    # Rows can't be added to the store through the element :
+    for content in (Elem('tr'), [Elem('tr')]):
+        try:
+            table.add_content(content)
+            raise(Exception("incorrect behaviour."))
+        except Exception as e:
+            assert isinstance(e, Elem.ValidationError)
+    assert len(store) == 3
+    print('Table from rows : OK.')
+
+
+def test_extend_content():
+    elem = Elem('ul')
+    # Any iterable, even a generator :
+    elem.extend_content(Elem('li', content=Text(i)) for i in range(3))
+    blank = Text(' ')
+    elem.extend_content([blank, Text(''), Text('\n'), Text('end')])
+    assert str(elem) == str(Elem('ul', content=[Elem('li', content=Text(i)) for i in range(3)]
+                                 + [Text('\n'), Text('end')]))
+    # Blank texts are skipped without keeping anything on them :
+    assert not vars(blank)
+    # Nothing is added if an item is invalid :
+    orphan = Elem('li')
+    other = Elem('ol', content=orphan)
+    try:
+        elem.extend_content(iter([Text('ok'), orphan, 'str']))
+        raise(Exception("incorrect behaviour."))
+    except Exception as e:
+        assert isinstance(e, Elem.ValidationError)
+    assert len(elem.content) == 5
+    # ... and the valid items aren't linked to the element :
+    html = str(elem)
+    orphan.add_content(Text('x'))
+    assert str(elem) is html and 'x' in str(other)
+    print('Bulk content : OK.')
+
+
+def test_lazy_content():
+    def items():
+        for i in range(3):
+            yield Elem('li', content=Text(i))
+        yield Text(' ')
+    eager = Elem('ul', content=list(items()))
+    # A function can be pulled any number of times :
+    lazy = Elem('ul', content=LazyContent(items))
+    assert str(lazy) == str(eager)
+    assert ''.join(lazy.iter_html()) == str(eager)
+    # A generator is streamed once :
+    lazy = Elem('ul', content=LazyContent(items()))
+    fp = io.StringIO()
+    lazy.write_to(fp)
+    assert fp.getvalue() == str(eager)
+    try:
+        lazy.write_to(io.StringIO())
+        raise(Exception("incorrect behaviour."))
+    except Exception as e:
+        assert isinstance(e, Elem.ValidationError)
+    # ... unless it is walked by something else first :
+    lazy = Elem('ul', content=LazyContent(items()))
+    assert len(list(lazy.content)) == 3
+    assert str(lazy) == str(eager) and ''.join(lazy.iter_html()) == str(eager)
+    assert str(Elem(content=LazyContent([Text(' ')]))) == '<div></div>'
+    # Items are checked as they are pulled :
+    try:
+        str(Elem(content=LazyContent([Text('ok'), 1])))
+        raise(Exception("incorrect behaviour."))
+    except Exception as e:
+        assert isinstance(e, Elem.ValidationError)
+    print('Lazy content : OK.')
+
+
+def test_render_cache():
+    li = Elem('li', content=Text('one'))
+    ul = Elem('ul', content=li)
+    body = Elem('body', content=[Elem('h1', content=Text('title')), ul])
+    html = str(body)
+    # Rendering again reuses the cached string :
+    assert str(body) is html
+    # Changes reach the cache of every ancestor :
+    li.add_content(Text('two'))
+    assert str(body) == html.replace('one', 'one\n      two')
+    # ... and every subtree rendered on the way is cached as well :
+    h1 = body.content[0]
+    assert isinstance(h1._html, str) and isinstance(li._html, str)
+    html = h1._html
+    li.add_content(Text('three'))
+    str(body)
+    assert h1._html is html and isinstance(ul._html, str)
+    ul.attr = {'class': 'list'}
+    assert '<ul class="list">' in str(body)
+    ul.attr['id'] = 'main'
+    assert '<ul class="list" id="main">' in str(body)
+    # Elements without attributes, and the tag, can be changed too :
+    elem = Elem(content=Text('x'))
+    str(elem)
+    elem.attr['id'] = 'y'
+    elem.tag = 'span'
+    assert str(elem) == '<span id="y">\n  x\n</span>'
+    # Shared attributes are copied only by the element that changes them :
+    attr = {'class': 'cell'}
+    cells = [Elem('td', attr, Text(i)) for i in range(2)]
+    row = Elem('tr', content=cells)
+    str(row)
+    cells[0].attr['id'] = 'first'
+    assert attr == {'class': 'cell'} and cells[1].attr == attr
+    assert str(row).count('id="first"') == 1
+    # A shared subtree invalidates all its parents :
+    shared = Elem('p', content=Text('shared'))
+    first, second = Elem(content=shared), Elem('span', content=shared)
+    str(first), str(second)
+    shared.add_content(Text('edited'))
+    assert 'edited' in str(first) and 'edited' in str(second)
+    # ... without keeping the discarded parents alive :
+    pages = [Elem('html', content=shared) for _ in range(1000)]
+    discarded = weakref.ref(pages[0])
+    del pages[:-1]
+    assert discarded() is None
+    shared.add_content(Text('again'))
+    assert 'again' in str(pages[0]) and 'again' in str(first)
+    # Rebuilding a deep chain of stale elements doesn't recurse :
+    chain = [Elem(content=Text('leaf'))]
+    for _ in range(1200):
+        chain.append(Elem(content=chain[-1]))
+    for elem in chain:
+        str(elem)
+    chain[0].add_content(Text('x'))
+    assert str(chain[-1]).count('x') == 1
+    print('Render cache : OK.')
+
+
 def test():
     test_text()
     test_elem_basics()
     test_embedding()
+    test_deep_embedding()
+    test_streaming()
+    test_node_store()
+    test_from_rows()
+    test_extend_content()
+    test_lazy_content()
+    test_render_cache()
+    test_attributes()
     test_empty_texts()
     test_errors()
     
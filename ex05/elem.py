@@ -1,35 +1,256 @@
-class Text(str):
+import sys
+from array import array
+from weakref import ref, WeakSet
+from itertools import chain
+from types import MappingProxyType
+from collections.abc import MutableMapping
+
+
+# Atributos compartidos (e inmutables) de todos los elementos sin atributos
+EMPTY_ATTRS = MappingProxyType({})
+
+
+def _indent(fragment, depth):
     """
-    Class to handle text within HTML elements, ensuring proper escaping.
+    Adapts a fragment to the depth of its element: indents its
+    line breaks and, inside another element, turns &quot; back
+    into double quotes.
     """
-    def __str__(self):
-        # Reemplaza caracteres especiales con sus entidades HTML correspondientes
-        text = super().__str__()
+    if depth:
+        fragment = fragment.replace("\n", "\n" + "  " * depth).replace("&quot;", '"')
+    return fragment
+
+
+def _escape(text):
+    """
+    Replaces the HTML special characters of a text by their entities.
+    A text without any of them is returned as it is.
+    """
+    # Comprobar con 'in' es más rápido que reemplazar cuando no hay nada que escapar
+    if "&" in text or "<" in text or ">" in text or '"' in text or "\n" in text:
         text = text.replace('&', '&amp;')
         text = text.replace('<', '&lt;')
         text = text.replace('>', '&gt;')
         text = text.replace('"', '&quot;')
         text = text.replace('\n', '\n<br />\n')
-        return text
+    return text
+
+
+def _make_attr(attr):
+    """
+    Generates the attribute string of an HTML element, sorted by key
+    and with escaped values. Equal strings are interned, so elements
+    with the same attributes share a single string.
+    """
+    result = ""  # Inicializa una cadena vacía para almacenar los atributos
+    # itera sobre los atributos ordenados por clave
+    for key, value in sorted(attr.items()):
+        value = str(value)
+        # Escape de los valores: &#34; no se ve afectado por el cambio
+        # de &quot; a comillas dentro de otro elemento
+        if "&" in value or '"' in value:
+            value = value.replace('&', '&amp;').replace('"', '&#34;')
+        # Agrega el atributo en formato key="value" a la cadena resultante
+        result += f' {key}="{value}"'
+    return sys.intern(result)  # Retorna la cadena con los atributos formateados
+
+
+# Cadenas de atributos ya generadas, según las claves y el texto de sus valores
+# (1, True y 1.0 son claves iguales en un dict, pero no se escriben igual): los
+# elementos que comparten (o repiten) los mismos atributos las generan una sola vez
+_FRAGMENTS = {}
+_FRAGMENTS_LIMIT = 4096
+
+
+def _attr_fragment(attr):
+    """
+    Returns the attribute string of a mapping, reusing the one of a
+    mapping with the same keys and rendered values when it has already
+    been generated.
+    """
+    key = tuple([(name, str(value)) for name, value in attr.items()])
+    fragment = _FRAGMENTS.get(key)
+    if fragment is None:
+        if len(_FRAGMENTS) >= _FRAGMENTS_LIMIT:
+            _FRAGMENTS.clear()
+        fragment = _FRAGMENTS[key] = _make_attr(attr)
+    return fragment
+
+
+class _OwnAttributes(dict):
+    """
+    Attributes copied by an element on its first change, so the
+    mapping it was given (maybe shared with other elements) is never
+    modified.
+    """
+
+    __slots__ = ()
+
+
+class Attributes(MutableMapping):
+    """
+    View of the attributes of an HTML element. Elements keep a
+    reference to the mapping they are given, with no copy; changing
+    the attributes through this view copies them for the element the
+    first time, and drops the cached HTML of the element (and of its
+    ancestors).
+    """
+
+    __slots__ = ('owner',)
+
+    def __init__(self, owner):
+        self.owner = owner  # Elemento al que pertenecen los atributos
+
+    def __getitem__(self, key):
+        return self.owner._attr[key]
+
+    def __contains__(self, key):
+        return key in self.owner._attr
+
+    def __iter__(self):
+        return iter(self.owner._attr)
+
+    def __len__(self):
+        return len(self.owner._attr)
+
+    def __repr__(self):
+        return repr(dict(self.owner._attr))
+
+    def __own(self):
+        """
+        Returns the attributes of the owner, copying them the first
+        time they change, and notifies the owner.
+        """
+        owner = self.owner
+        if owner._attr.__class__ is not _OwnAttributes:
+            owner._attr = _OwnAttributes(owner._attr)
+        owner._changed()
+        return owner._attr
+
+    def __setitem__(self, key, value):
+        self.__own()[key] = value
+
+    def __delitem__(self, key):
+        attr = self.__own()
+        del attr[key]
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def clear(self):
+        self.__own().clear()
+
+    def update(self, *args, **kwargs):
+        self.__own().update(*args, **kwargs)
+
+
+class Text(str):
+    """
+    Class to handle text within HTML elements, ensuring proper escaping.
+    """
+    def __str__(self):
+        # Reemplaza caracteres especiales con sus entidades HTML correspondientes
+        return _escape(str.__str__(self))
+
+    @staticmethod
+    def escape_many(strings):
+        """
+        Escapes a list of strings at once, with a single pass
+        over all of them when possible.
+        :param strings: Iterable of strings.
+        :return: (list) The escaped strings, in the same order.
+        """
+        strings = [str.__str__(item) if isinstance(item, str) else str(item) for item in strings]
+        joined = "\0".join(strings)
+        # El separador no puede aparecer dentro de los textos
+        if joined.count("\0") != max(len(strings) - 1, 0):
+            return [_escape(item) for item in strings]
+        if not strings:
+            return []
+        return _escape(joined).split("\0")
+
+
+# Marca del HTML en caché de un elemento modificado después de renderizarse
+_STALE = object()
+
+# Veredictos de validación que Page guarda en cada elemento (None si no se conoce
+# o si su propio contenido ha cambiado):
+# - VALID: el elemento y todos sus descendientes son válidos
+# - INVALID: el elemento incumple la regla de su etiqueta
+# - INVALID_CHILD: el elemento cumple su regla, pero algún descendiente no
+# - CHANGED_CHILD: el elemento cumple su regla, pero algún descendiente ha cambiado
+VALID, INVALID, INVALID_CHILD, CHANGED_CHILD = "valid", "invalid", "invalid-child", "changed-child"
+
+
+class _ClassDefault:
+    """
+    Tag or tag type set at class level by a subclass of Elem (as the
+    classes of elements.py do). Read on the class, it is the class
+    value; read on an element, it is the value of the element, which
+    can be changed like that of any other Elem.
+    """
+
+    __slots__ = ('default', 'slot', 'prop')
+
+    def __init__(self, default, slot, prop):
+        self.default = default  # Valor de la clase
+        self.slot = slot  # Slot de Elem con el valor de cada elemento
+        self.prop = prop  # Propiedad de Elem que valida los cambios
+
+    def __get__(self, elem, cls=None):
+        if elem is None:
+            return self.default
+        return self.slot.__get__(elem, cls)
+
+    def __set__(self, elem, value):
+        self.prop.__set__(elem, value)
 
 
 class Elem:
     """
     Class to represent HTML elements.
+    Instances use __slots__ instead of a per-instance __dict__, and
+    elements without attributes share the immutable EMPTY_ATTRS.
+    The HTML of an element is cached once rendered, and dropped
+    (along with the cache of its ancestors) when it changes. The same
+    goes for the validation verdict that Page keeps on each element.
+    The tag and tag type that subclasses set at class level are the
+    defaults of their elements: elem.tag can still be changed.
     """
 
+    __slots__ = ('_tag', '_tag_type', '_attr', 'content', '_html', '_parent', '_verdict', '__weakref__')
+
+    _defaults = (None, None)  # tag y tag_type fijados por la clase, o None
+
     class ValidationError(Exception):
         """
         Custom exception for validation errors in Elem.
         """
         pass
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Las subclases de elements.py fijan tag y tag_type a nivel de clase
+        for name, slot in (("tag", Elem._tag), ("tag_type", Elem._tag_type)):
+            value = cls.__dict__.get(name)
+            if isinstance(value, str):
+                setattr(cls, name, _ClassDefault(value, slot, Elem.__dict__[name]))
+        cls._defaults = tuple(value if isinstance(value, str) else None
+                              for value in (cls.tag, cls.tag_type))
+
     def __init__(self, tag="div", attr=None, content=None, tag_type="double"):
-        if attr is None:
-            attr = {}
-        self.tag = tag  # Nombre de la etiqueta HTML
-        self.attr = attr  # Atribuos de la etiqueta HTML
-        self.tag_type = tag_type  # Tipo de etiqueta: doble o simple
+        default_tag, default_type = self._defaults
+        if default_tag is not None:
+            tag = default_tag  # Valores de la subclase
+        if default_type is not None:
+            tag_type = default_type
+        self._tag = tag  # Nombre de la etiqueta HTML
+        self._tag_type = tag_type  # Tipo de etiqueta: doble o simple
+        self._html = None  # HTML en caché
+        self._verdict = None  # Veredicto de validación en caché
+        self._parent = None  # Referencia débil al padre, o WeakSet de padres si se comparte
+        self.__set_attr(attr)  # Atributos de la etiqueta HTML
 
         # Verifica que el tipo de etiqueta sea válido
         if tag_type not in ["double", "simple"]:
@@ -39,69 +260,342 @@ class Elem:
         if content is not None:
             self.add_content(content)  # Agrega contenido si es proporcionado
 
+    @property
+    def tag(self):
+        """
+        Name of the HTML tag.
+        """
+        return self._tag
+
+    @tag.setter
+    def tag(self, tag):
+        self._tag = tag
+        self._changed()
+
+    @property
+    def tag_type(self):
+        """
+        Type of the tag: "double" (<tag></tag>) or "simple" (<tag />).
+        """
+        return self._tag_type
+
+    @tag_type.setter
+    def tag_type(self, tag_type):
+        if tag_type not in ["double", "simple"]:
+            raise Elem.ValidationError("Invalid tag type.")
+        self._tag_type = tag_type
+        self._changed()
+
+    @property
+    def attr(self):
+        """
+        Attributes of the HTML tag, as an Attributes view: changing
+        them drops the cached HTML.
+        """
+        return Attributes(self)
+
+    @attr.setter
+    def attr(self, attr):
+        self.__set_attr(attr)
+        self._changed()
+
+    def __set_attr(self, attr):
+        """
+        Keeps a reference to the given attributes, or EMPTY_ATTRS if
+        there are none. Later changes have to go through the attr view,
+        so that the cached HTML is dropped.
+        """
+        if isinstance(attr, Attributes):
+            owner, attr = attr.owner, attr.owner._attr
+            if owner is not self and attr.__class__ is _OwnAttributes:
+                attr = dict(attr)  # Su elemento aún puede cambiarlos
+        self._attr = attr if attr else EMPTY_ATTRS
+
     def __str__(self):
         """
         Generates the HTML representation of the element.
+        The result is cached until the element or its content changes.
         """
-        if self.tag_type == "double":
-            # Si el elemento no tiene contenido, devueve una etiqueta vacía <tag></tag>
-            if not self.content:
-                return f"<{self.tag}{self.__make_attr()}></{self.tag}>"
-            # Si tiene contenido, genera la etiquela con su contenido anidado
-            return f"<{self.tag}{self.__make_attr()}>{self.__make_content()}</{self.tag}>"
-        elif self.tag_type == "simple":
-            # Si es un elemento de tipo "simple" (ej. <img />, <meta />), se cierra automáticamente
-            return f"<{self.tag}{self.__make_attr()} />"
+        html = self._html
+        if html.__class__ is not str:
+            html = self.__render()
+        return html
 
-    def __make_attr(self):
+    def __render(self):
+        """
+        Builds the HTML of the element from the bottom up, with an
+        explicit stack instead of recursion. Every element rebuilt on
+        the way keeps its HTML in cache, and unchanged subtrees reuse
+        theirs, so after an edit only the path to the change is built
+        again.
+        """
+        stack = []  # Elementos abiertos: (elem, apertura, hijos, líneas de sus hijos)
+        node = self
+        while True:
+            # Bajar: HTML en caché, elemento sin hijos, o un elemento abierto más
+            html = node._html
+            if html.__class__ is not str:
+                opening = f"<{node._tag}{node.__make_attr()}"
+                content = node.content
+                children = None
+                if node._tag_type == "simple":
+                    html = opening + " />"
+                elif isinstance(content, NodeStore):
+                    if content:
+                        html = f"{opening}>{''.join(content.iter_html(1))}\n</{node._tag}>"
+                elif isinstance(content, LazyContent):
+                    children = content.stream()
+                    first = next(children, None)
+                    if first is not None:
+                        children = chain((first,), children)
+                    else:
+                        children = None
+                elif content:
+                    children = iter(content)
+                if children is not None:
+                    stack.append((node, opening + ">", children, []))
+                else:
+                    if html.__class__ is not str:
+                        html = f"{opening}></{node._tag}>"
+                    node._html = html
+            # Subir: añadir el HTML terminado a su padre y seguir con sus hijos
+            node = None
+            while stack:
+                elem, opening, children, lines = stack[-1]
+                if html.__class__ is str:
+                    lines.append("\n" + html)
+                    html = None
+                for child in children:
+                    if isinstance(child, Elem):
+                        node = child
+                        break
+                    text = str(child).strip()  # Los textos vacíos no se escriben
+                    if text:
+                        lines.append("\n" + text)
+                if node is not None:
+                    break
+                stack.pop()
+                # Los hijos se sangran una sola vez, todos juntos
+                body = _indent("".join(lines), 1) if lines else "\n"  # Sin hijos escritos: línea vacía
+                html = elem._html = f"{opening}{body}\n</{elem._tag}>"
+            if node is None:
+                return html
+
+    def _changed(self):
         """
-        Generates the attribute string for the HTML element.
+        Drops the cached HTML of the element and of all its ancestors.
+        The element has to be validated again, while its ancestors only
+        have to look at the children that changed.
         """
-        result = ""  # Inicializa una cadena vacía para almacenar los atributos
-        # itera sobre los atributos ordenados por clave
-        for key, value in sorted(self.attr.items()):
-            # Agrega el atributo en formato key="value" a la cadena resultante
-            result += f' {key}="{value}"'
-        return result  # Retorna la cadena con los atributos formateados
+        self._verdict = None
+        pending = [self]
+        while pending:
+            elem = pending.pop()
+            if elem._html is not None:
+                elem._html = _STALE
+            if elem._verdict is VALID or elem._verdict is INVALID_CHILD:
+                elem._verdict = CHANGED_CHILD
+            parent = elem._parent
+            if parent.__class__ is ref:
+                parent = parent()
+                if parent is not None:
+                    pending.append(parent)
+            elif parent is not None:
+                pending.extend(parent)
 
-    def __make_content(self):
+    def __adopt(self, child):
         """
-        Generates the content of the element, including nested elements,
-        ensuring proper indentation and formatting.
+        Registers the element as a parent of child, so changes in
+        child reach the cache of the element. Parents are weak
+        references: a subtree shared by many pages (such as a common
+        <head>) doesn't keep the discarded pages alive.
         """
-        if not self.content:
+        parent = child._parent
+        if parent is None:
+            # Los hermanos comparten la misma referencia débil a su padre
+            child._parent = ref(self)
+        elif parent.__class__ is ref:
+            previous = parent()
+            if previous is None:
+                child._parent = ref(self)
+            elif previous is not self:
+                child._parent = WeakSet((previous, self))
+        else:
+            parent.add(self)
+
+    def iter_html(self, visit=None):
+        """
+        Walks the tree once, with an explicit stack, and yields the
+        serialized fragments in document order. Each fragment is
+        indented for the depth of its element, so nested content is
+        never re-copied once per ancestor, and only the open elements
+        are kept in memory.
+        :param visit: Optional function called with each element and
+        an iterator of its children, when the element is reached. The
+        children are then pulled from the iterator it returns, which
+        lets the caller check them in the same walk (see Page).
+        Cached subtrees are only reused if their verdict is valid.
+        """
+        stack = []  # Elementos abiertos: [elem, profundidad, hijos, algún hijo escrito]
+        elem, depth = self, 0
+        while True:
+            if elem is not None and elem._html.__class__ is str and (visit is None or elem._verdict is VALID):
+                # Subárbol sin cambios: se reutiliza su HTML en caché
+                yield _indent(elem._html, depth)
+                elem = None
+            if elem is not None and visit is not None:
+                # Recorrido con visita: todos los hijos pasan por visit
+                opening = f"<{elem._tag}{elem.__make_attr()}"
+                content = elem.content
+                children = visit(elem, content.stream() if isinstance(content, LazyContent) else iter(content))
+                if elem._tag_type == "simple":
+                    for _ in children:
+                        pass
+                    yield _indent(opening + " />", depth)
+                else:
+                    first = next(children, None)
+                    if first is None:
+                        yield _indent(f"{opening}></{elem._tag}>", depth)
+                    else:
+                        yield _indent(opening + ">", depth)
+                        stack.append([elem, depth, chain((first,), children), False])
+                elem = None
+            if elem is not None:
+                opening = f"<{elem._tag}{elem.__make_attr()}"
+                if elem._tag_type == "simple":
+                    # Elemento de tipo "simple" (ej. <img />, <meta />), se cierra automáticamente
+                    yield _indent(opening + " />", depth)
+                elif not elem.content:
+                    # Sin contenido, etiqueta vacía <tag></tag>
+                    yield _indent(f"{opening}></{elem._tag}>", depth)
+                elif isinstance(elem.content, NodeStore):
+                    # Contenido plano: se serializa directamente desde sus arrays
+                    yield _indent(opening + ">", depth)
+                    yield from elem.content.iter_html(depth + 1)
+                    yield "\n" + "  " * depth + _indent(f"</{elem._tag}>", depth)
+                elif isinstance(elem.content, LazyContent):
+                    # Contenido perezoso: se extrae a medida que se escribe
+                    children = elem.content.stream()
+                    first = next(children, None)
+                    if first is None:
+                        yield _indent(f"{opening}></{elem._tag}>", depth)
+                    else:
+                        yield _indent(opening + ">", depth)
+                        stack.append([elem, depth, chain((first,), children), False])
+                else:
+                    yield _indent(opening + ">", depth)
+                    stack.append([elem, depth, iter(elem.content), False])
+                elem = None
+            if not stack:
+                return
+
+            frame = stack[-1]
+            parent, depth, children = frame[0], frame[1], frame[2]
+            for child in children:
+                if isinstance(child, Elem):
+                    frame[3] = True
+                    yield "\n" + "  " * (depth + 1)
+                    elem, depth = child, depth + 1
+                    break
+                text = str(child).strip()  # Los textos vacíos no se escriben
+                if text:
+                    frame[3] = True
+                    yield "\n" + "  " * (depth + 1) + _indent(text, depth + 1)
+            else:
+                # Todos los hijos escritos: cerrar la etiqueta en su propia línea
+                stack.pop()
+                closing = "\n" + "  " * depth
+                if not frame[3]:
+                    closing += closing
+                yield closing + _indent(f"</{parent._tag}>", depth)
+
+    def write_to(self, fp):
+        """
+        Streams the HTML representation of the element into a file-like
+        object, without building the whole document in memory.
+        :param fp: Object with a write() method, e.g. an open text file.
+        """
+        write = fp.write
+        for fragment in self.iter_html():
+            write(fragment)
+
+    def __make_attr(self):
+        """
+        Generates the attribute string for the HTML element, or reuses
+        the one of equal attributes.
+        """
+        attr = self._attr
+        if attr is EMPTY_ATTRS:
             return ""
-        result = []
-        for elem in self.content:
-            elem_str = str(elem).strip()  # Convierte el contenido a string y elimina espacios en blanco.
-            if elem_str:  # Verifica que el contenido no esté vacío.
-                # Agrega indentación y reemplaza &quot; por comillas dobles.
-                indented_content = "  " + elem_str.replace("\n", "\n  ").replace("&quot;", '"')
-                result.append(indented_content)
-        # Retorna el contenido formateado con saltos de línea antes y después.
-        return "\n" + "\n".join(result) + "\n"
+        return _attr_fragment(attr)
 
     def add_content(self, content):
         """
         Adds content to the element, ensuring it follows validation rules.
         """
+        # Si el contenido es una lista, se procesa en una sola pasada.
+        if isinstance(content, list):
+            self.extend_content(content)
+            return
+        # El contenido perezoso sustituye a una lista de contenido vacía.
+        if isinstance(content, LazyContent):
+            if not isinstance(self.content, list) or self.content:
+                raise Elem.ValidationError("Lazy content cannot be mixed with other content.")
+            self.content = content
+            self._changed()
+            return
         # Verifica si el contenido es válido según la función estática check_type().
         if not Elem.check_type(content):
             raise Elem.ValidationError("Invalid content.")  # Lanza una excepción si el contenido no es válido.
-        # Si el contenido es una lista, se procesa cada elemento individualmente.
-        if isinstance(content, list):
-            for item in content:
-                if not Elem.check_type(item):
-                    raise Elem.ValidationError("Invalid content in list.")
-                if isinstance(item, Text) and not str(item).strip():  # Ignora cadenas vacías.
-                    continue
-                self.content.append(item)
-        # Si el contenido es una instancia de Text y está vacío, se ignora.
-        elif isinstance(content, Text) and not str(content).strip():
+        self.__check_list()
+        # Si el contenido es una instancia de Text y está vacío, se ignora
+        # (sin escaparlo: solo un salto de línea deja de estar vacío al escaparse).
+        if isinstance(content, Text) and not str.strip(content) and "\n" not in content:
             return
-        # Si el contenido no es una lista, ni un texto vacío, se agrega directamente.
-        else:
-            self.content.append(content)  # Agrega elto válido a lista contenido.
+        # Si el contenido no es un texto vacío, se agrega directamente.
+        if isinstance(content, Elem):
+            self.__adopt(content)
+        self.content.append(content)  # Agrega elto válido a lista contenido.
+        self._changed()
+
+    def __check_list(self):
+        """
+        Checks that the content is a list that items can be added to.
+        """
+        if not isinstance(self.content, list):
+            raise Elem.ValidationError(
+                f"Content held in a {type(self.content).__name__} cannot be added to.")
+
+    def extend_content(self, items):
+        """
+        Adds many items at once. Each item is type-checked and filtered
+        in the same pass that adds it, and blank texts are detected
+        without escaping them. Nothing is added if an item is invalid.
+        :param items: Iterable of Elem and Text instances, such as a
+        list or a generator.
+        """
+        self.__check_list()
+        added = []
+        append = added.append
+        adopted = False
+        for item in items:
+            if isinstance(item, Text):
+                # Un texto es vacío si solo tiene espacios (un salto de línea se convierte en <br />)
+                if not str.strip(item) and "\n" not in item:
+                    continue
+            elif isinstance(item, Elem):
+                adopted = True
+            else:
+                raise Elem.ValidationError("Invalid content in list.")
+            append(item)
+        if added:
+            # Los hijos se registran solo cuando toda la lista es válida
+            if adopted:
+                for item in added:
+                    if isinstance(item, Elem):
+                        self.__adopt(item)
+            self.content.extend(added)
+            self._changed()
 
     @staticmethod
     def check_type(content):
@@ -114,6 +608,313 @@ class Elem:
         )
 
 
+class LazyContent:
+    """
+    Content of an element pulled from a source only when the element
+    is serialized or validated, so its items are never all in memory.
+    The items are checked (and blank texts dropped) as they are pulled.
+    A function returning an iterable, or an iterable such as a list,
+    can be walked any number of times. A one-shot iterator such as a
+    generator is streamed once by iter_html(), while any other walk
+    (like Page.is_valid()) keeps its items in memory for later walks.
+    Changes in the source are not tracked by the caches of the element.
+    """
+
+    __slots__ = ('source', 'items', 'consumed')
+
+    def __init__(self, source):
+        """
+        Constructor for the LazyContent class.
+        :param source: Function returning an iterable of Elem and Text
+        instances, or such an iterable.
+        """
+        if not callable(source) and not hasattr(source, "__iter__"):
+            raise Elem.ValidationError("Invalid lazy content.")
+        self.source = source
+        self.items = None  # Elementos guardados en memoria
+        self.consumed = False  # Iterador de un solo uso ya recorrido
+
+    def __iter__(self):
+        """
+        Walks the items, keeping in memory those of a one-shot iterator.
+        """
+        if self.items is None and self.__one_shot():
+            self.items = list(self.stream())
+        return self.stream()
+
+    def stream(self):
+        """
+        Walks the items without keeping them in memory.
+        :return: Iterator of the checked items.
+        """
+        if self.items is not None:
+            return iter(self.items)
+        if callable(self.source):
+            return LazyContent.__check(self.source())
+        if self.__one_shot():
+            if self.consumed:
+                raise Elem.ValidationError("The lazy content has already been consumed.")
+            self.consumed = True
+        return LazyContent.__check(self.source)
+
+    def __one_shot(self):
+        """
+        Tells whether the source is an iterator that can be walked once.
+        """
+        return not callable(self.source) and iter(self.source) is self.source
+
+    @staticmethod
+    def __check(items):
+        """
+        Yields the items that are Elem or non-blank Text instances.
+        """
+        for item in items:
+            if isinstance(item, Text):
+                # Un texto es vacío si solo tiene espacios (un salto de línea se convierte en <br />)
+                if not str.strip(item) and "\n" not in item:
+                    continue
+            elif not isinstance(item, Elem):
+                raise Elem.ValidationError("Invalid content in list.")
+            yield item
+
+
+class NodeStore:
+    """
+    Flat, array-backed storage for the content of an element.
+    Nodes are kept in document order in parallel arrays (kind, parent,
+    attributes and text offset) instead of one Elem or Text object per
+    node, and serialize to the same HTML as the equivalent Elem tree.
+    Iterating over the store builds the Elem objects on demand.
+    """
+
+    TEXT = 0  # Tipo reservado para los nodos de texto
+
+    def __init__(self):
+        """
+        Constructor for the NodeStore class.
+        """
+        self.kinds = [None]  # Tipo -> (clase, etiqueta, tipo de etiqueta)
+        self.kind_ids = {}
+        self.attrs = [EMPTY_ATTRS]  # Atributos distintos, 0 = sin atributos
+        self.fragments = [""]  # Atributos ya serializados, mismo índice
+        self.attr_ids = {(): 0}
+        self.kind = array('H')  # Tipo de cada nodo
+        self.parent = array('q')  # Índice del padre de cada nodo, -1 si es de primer nivel
+        self.attr = array('L')  # Índice de los atributos de cada nodo
+        self.offset = array('Q')  # Comienzo del texto de cada nodo en el búfer
+        self.tops = array('Q')  # Índices de los nodos de primer nivel
+        self.path = []  # Elementos dobles abiertos, del primer nivel al último añadido
+        self.chunks = []  # Textos añadidos, unidos bajo demanda en el búfer
+        self.size = 0
+        self.buffer = ""
+
+    def __len__(self):
+        """
+        Returns the number of top-level nodes.
+        """
+        return len(self.tops)
+
+    def __iter__(self):
+        """
+        Yields the top-level nodes as Elem and Text objects, building
+        each subtree only when it is reached.
+        """
+        ends = list(self.tops[1:]) + [len(self.kind)]
+        for start, end in zip(self.tops, ends):
+            yield self.build(start, end)
+
+    def add_elem(self, cls, tag=None, attr=None, tag_type=None, parent=-1):
+        """
+        Adds an element node.
+        :param cls: Class of the element (Elem or a subclass of elements.py).
+        :param tag: Tag name. The class tag is used if None.
+        :param attr: Attributes of the element.
+        :param tag_type: "double" or "simple". The class one is used if None.
+        :param parent: Index of the parent node, -1 for a top-level node.
+        It must be a double element on the path to the last added node,
+        as nodes are stored in document order.
+        :return: (int) Index of the new node.
+        """
+        tag = cls.tag if tag is None else tag
+        tag_type = cls.tag_type if tag_type is None else tag_type
+        if tag_type not in ["double", "simple"]:
+            raise Elem.ValidationError("Invalid tag type.")
+        key = (cls, tag, tag_type)
+        kind = self.kind_ids.get(key)
+        if kind is None:
+            kind = self.kind_ids[key] = len(self.kinds)
+            self.kinds.append(key)
+        index = self.__add(kind, self.__attr_id(attr), parent)
+        if tag_type == "double":
+            self.path.append(index)
+        return index
+
+    def add_text(self, value, parent=-1):
+        """
+        Adds a text node. Texts that would render blank are skipped,
+        as Elem.add_content() does.
+        :param value: Text of the node, converted to str.
+        :param parent: Index of the parent node, -1 for a top-level node.
+        It must be a double element on the path to the last added node.
+        :return: (int) Index of the new node, or None if skipped.
+        """
+        value = str.__str__(value) if isinstance(value, str) else str(value)
+        # Un texto es vacío si solo tiene espacios (un salto de línea se convierte en <br />)
+        if not value.strip() and "\n" not in value:
+            self.__close(parent)
+            return None
+        index = self.__add(NodeStore.TEXT, 0, parent)
+        self.chunks.append(value)
+        self.size += len(value)
+        return index
+
+    def append(self, node, parent=-1):
+        """
+        Flattens an Elem or Text subtree into the store.
+        :param node: The Elem or Text to add.
+        :param parent: Index of the parent node, -1 for a top-level node.
+        """
+        pending = [(node, parent)]
+        while pending:
+            node, parent = pending.pop()
+            if isinstance(node, Text):
+                self.add_text(node, parent)
+                continue
+            index = self.add_elem(type(node), node.tag, node._attr, node.tag_type, parent)
+            pending.extend((child, index) for child in reversed(list(node.content)))
+
+    def build(self, start, end):
+        """
+        Builds the Elem or Text object of the subtree stored in
+        the nodes [start, end).
+        """
+        nodes = [self.__node(index) for index in range(start, end)]
+        children = {}  # Índice del padre -> hijos, en orden
+        for index in range(start + 1, end):
+            children.setdefault(self.parent[index], []).append(nodes[index - start])
+        # De los más profundos a la raíz, cada elemento recibe (y registra) sus hijos de una vez
+        for index in sorted(children, reverse=True):
+            nodes[index - start].extend_content(children[index])
+        return nodes[0]
+
+    def iter_html(self, depth):
+        """
+        Yields the serialized fragments of the stored nodes, each one on
+        its own line, as Elem.iter_html() does for the content of an element.
+        :param depth: Depth of the top-level nodes.
+        """
+        kinds, fragments, buffer = self.kinds, self.fragments, self.__text()
+        kind, parent, attr, offset = self.kind, self.parent, self.attr, self.offset
+        count = len(kind)
+        lines = {}  # (tipo, atributos, nivel) -> líneas de apertura, cierre y vacía
+        stack = []  # Nodos abiertos: (índice, línea de cierre)
+        # Los fragmentos se agrupan en bloques para no ceder uno por nodo
+        block = []
+        write = block.append
+        for index in range(count):
+            if len(block) >= 1024:
+                yield "".join(block)
+                block.clear()
+            while stack and stack[-1][0] != parent[index]:
+                write(stack.pop()[1])
+            level = depth + len(stack)
+            if kind[index] == NodeStore.TEXT:
+                end = offset[index + 1] if index + 1 < count else len(buffer)
+                text = _escape(buffer[offset[index]:end]).strip()
+                write("\n" + "  " * level + _indent(text, level))
+                continue
+            key = (kind[index], attr[index], level)
+            line = lines.get(key)
+            if line is None:
+                _, tag, tag_type = kinds[kind[index]]
+                opening = f"<{tag}{fragments[attr[index]]}"
+                newline = "\n" + "  " * level
+                if tag_type == "simple":
+                    line = (newline + _indent(opening + " />", level), None, None)
+                else:
+                    line = (newline + _indent(opening + ">", level),
+                            newline + _indent(f"</{tag}>", level),
+                            newline + _indent(f"{opening}></{tag}>", level))
+                lines[key] = line
+            if line[1] is None:
+                write(line[0])
+            elif index + 1 < count and parent[index + 1] == index:
+                write(line[0])
+                stack.append((index, line[1]))
+            else:
+                write(line[2])
+        while stack:
+            write(stack.pop()[1])
+        yield "".join(block)
+
+    def __close(self, parent):
+        """
+        Closes the open elements after parent, which must be open.
+        """
+        path = self.path
+        if parent < 0:
+            path.clear()
+        elif not path or path[-1] != parent:
+            # Solo se puede seguir añadiendo a un elemento doble aún abierto
+            try:
+                depth = path.index(parent)
+            except ValueError:
+                raise Elem.ValidationError(f"Node {parent} is not an open element of the store.") from None
+            del path[depth + 1:]
+
+    def __add(self, kind, attr, parent):
+        """
+        Appends a node to the parallel arrays.
+        """
+        self.__close(parent)
+        index = len(self.kind)
+        if parent < 0:
+            self.tops.append(index)
+        self.kind.append(kind)
+        self.parent.append(parent)
+        self.attr.append(attr)
+        self.offset.append(self.size)
+        return index
+
+    def __text(self):
+        """
+        Returns the text buffer, joining the texts added since the last call.
+        """
+        if self.chunks:
+            self.buffer += "".join(self.chunks)
+            self.chunks = []
+        return self.buffer
+
+    def __attr_id(self, attr):
+        """
+        Returns the index of a set of attributes, sharing it between
+        all the nodes with the same attributes.
+        """
+        if not attr:
+            return 0
+        # La clase del valor distingue 1, True y 1.0, que se escriben distinto
+        key = tuple(sorted((name, value.__class__, str(value)) for name, value in attr.items()))
+        attr_id = self.attr_ids.get(key)
+        if attr_id is None:
+            attr_id = self.attr_ids[key] = len(self.attrs)
+            self.attrs.append(MappingProxyType(dict(attr)))
+            self.fragments.append(_make_attr(attr))
+        return attr_id
+
+    def __node(self, index):
+        """
+        Builds the Elem or Text object of a single node, without children.
+        """
+        if self.kind[index] == NodeStore.TEXT:
+            end = self.offset[index + 1] if index + 1 < len(self.kind) else self.size
+            return Text(self.__text()[self.offset[index]:end])
+        cls, tag, tag_type = self.kinds[self.kind[index]]
+        elem = cls.__new__(cls)
+        Elem.__init__(elem, tag, self.attrs[self.attr[index]], None, tag_type)
+        elem._tag, elem._tag_type = tag, tag_type  # Aunque cambien los de su clase
+        return elem
+
+
 def generate_html():
     """
     Generates a sample HTML document structure and prints it.
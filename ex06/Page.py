@@ -1,4 +1,11 @@
-from elem import Elem, Text
+import io
+import os
+import gzip
+import tempfile
+from contextlib import contextmanager
+from collections import namedtuple
+from itertools import islice
+from elem import Elem, Text, LazyContent, VALID, INVALID, INVALID_CHILD, CHANGED_CHILD
 from elements import Html, Head, Body, Title, Meta, Img, Table, Th, Tr, Td, Ul, Ol, Li, H1, H2, P, Div, Span, Hr, Br
 
 
@@ -7,6 +14,56 @@ class Page:
     Class representing an HTML document with structure validation.
     """
 
+    # Regla de validación de una etiqueta:
+    # - allowed: clases permitidas para los elementos hijos
+    # - minimum: número mínimo de hijos
+    # - exact: solo se permiten los hijos de allowed (ni siquiera textos)
+    # - exclusive: todos los elementos hijos deben ser del mismo tipo
+    # - counted: pares (clase, número exacto de hijos de esa clase)
+    Rule = namedtuple("Rule", ["allowed", "minimum", "exact", "exclusive", "counted"])
+
+    # Error de validación: ruta del nodo, etiqueta, regla incumplida y detalle
+    Error = namedtuple("Error", ["path", "tag", "rule", "detail"])
+
+    # Tamaño por defecto del búfer de escritura de los archivos
+    BUFFER_SIZE = 1 << 16
+
+    # Reglas compiladas una sola vez, asociadas a cada etiqueta HTML
+    TEXT_ONLY = Rule(frozenset(), 0, False, False, ())
+    EMPTY = Rule(frozenset(), 0, True, False, ())
+    LIST = Rule(frozenset({Li}), 1, False, False, ())
+    RULES = {
+        "html": Rule(frozenset({Head, Body}), 0, False, False, ((Head, 1), (Body, 1))),
+        "head": Rule(frozenset({Title, Meta}), 0, False, False, ((Title, 1),)),
+        "body": Rule(frozenset({H1, H2, Div, Table, Ul, Ol, Span, P, Hr, Br, Img}), 0, False, False, ()),
+        "div": Rule(frozenset({H1, H2, Div, Table, Ul, Ol, Span, P}), 0, False, False, ()),
+        "title": TEXT_ONLY,
+        "h1": TEXT_ONLY,
+        "h2": TEXT_ONLY,
+        "li": TEXT_ONLY,
+        "th": TEXT_ONLY,
+        "td": TEXT_ONLY,
+        "p": TEXT_ONLY,
+        "span": Rule(frozenset({P}), 0, False, False, ()),
+        "ul": LIST,
+        "ol": LIST,
+        "tr": Rule(frozenset({Th, Td}), 0, False, True, ()),
+        "table": Rule(frozenset({Tr}), 0, False, False, ()),
+        "hr": EMPTY,
+        "br": EMPTY,
+        "meta": EMPTY,
+        "img": TEXT_ONLY,
+    }
+
+    class _Abort(Exception):
+        """
+        Stops a validated rendering at the first error.
+        """
+
+        def __init__(self, error):
+            super().__init__(error.detail)
+            self.error = error
+
     def __init__(self, root: Elem):
         """
         Initializes the Page instance.
@@ -19,113 +76,236 @@ class Page:
     def is_valid(self) -> bool:
         """
         Checks if the HTML document structure is valid.
+        The verdict of every element is kept between calls, so after
+        an edit only the edited element and the path to it are checked.
+        The items of a one-shot lazy content (such as a generator) are
+        kept in memory by this check; only render_validated() checks
+        them without holding them. Once such a content has been streamed
+        (by str() or write_to_file()) it can't be checked any more, and
+        the page is reported as invalid.
         :return: True if valid, False otherwise.
         """
-        result = isinstance(self.root, Html) and self._validate_tree(self.root)
+        result = isinstance(self.root, Html) and self._check_tree(self.root)
         return result
 
-    def _validate_tree(self, elem: Elem) -> bool:
-        """
-        Recursively validates the structure of the HTML tree.
-        :param elem: The element to validate.
-        :return: True if the element and its children are valid, False otherwise.
-        """
-
-        # Definición de funciones internas para validar cada tipo de etiquetas HTML
-        def validate_html(e):
-            if not self._check_children(e, [Head, Body], exact=True):
-                return False
-            head_count = sum(1 for child in e.content if isinstance(child, Head))
-            body_count = sum(1 for child in e.content if isinstance(child, Body))
-            return head_count == 1 and body_count == 1
-
-        def validate_head(e):
-            return self._check_children(e, [Title, Meta], exact=False) and sum(
-                1 for child in e.content if isinstance(child, Title)) == 1
-
-        def validate_body(e):
-            return self._check_children(e, [H1, H2, Div, Table, Ul, Ol, Span, P, Text, Hr, Br, Img], exact=False)
-
-        def validate_div(e):
-            return self._check_children(e, [H1, H2, Div, Table, Ul, Ol, Span, P, Text], exact=False)
-
-        def validate_text_only(e):
-            return self._check_children(e, [Text], exact=True)
-
-        def validate_span(e):
-            return self._check_children(e, [Text, P], exact=False)
-
-        def validate_list(e):
-            return self._check_children(e, [Li], exact=False, minimum=1)
-
-        def validate_tr(e):
-            return self._check_children(e, [Th, Td], exact=False, exclusive=True)
-
-        def validate_table(e):
-            return self._check_children(e, [Tr], exact=False)
-
-        def validate_img(e):
-            return self._check_children(e, [], exact=True)
-
-        def validate_empty(e):
-            return len(e.content) == 0
-
-        # Diccionario que asocia etiquetas con sus funciones de validación
-        rules = {
-            "html": validate_html,
-            "head": validate_head,
-            "body": validate_body,
-            "div": validate_div,
-            "title": validate_text_only,
-            "h1": validate_text_only,
-            "h2": validate_text_only,
-            "li": validate_text_only,
-            "th": validate_text_only,
-            "td": validate_text_only,
-            "p": validate_text_only,
-            "span": validate_span,
-            "ul": validate_list,
-            "ol": validate_list,
-            "tr": validate_tr,
-            "table": validate_table,
-            "hr": validate_empty,
-            "br": validate_empty,
-            "meta": validate_empty,
-            "img": validate_img
-        }
-
-        if elem.tag not in rules:
-            return False
-
-        if not rules[elem.tag](elem):
-            return False
+    def validate(self, mode="first") -> list:
+        """
+        Validates the HTML document and reports why it is invalid.
+        As in is_valid(), the items of a one-shot lazy content are kept
+        in memory, and an already streamed one is reported as an error.
+        :param mode: "first" to stop at the first error, or "all" to
+        collect every error in a single traversal.
+        :return: (list) Page.Error records in document order, empty if valid.
+        """
+        if mode not in ("first", "all"):
+            raise ValueError('The mode must be "first" or "all".')
+        errors = self._iter_errors(self.root)
+        return list(islice(errors, 1)) if mode == "first" else list(errors)
+
+    def _iter_errors(self, root: Elem):
+        """
+        Walks the HTML tree in document order, with an explicit stack
+        instead of recursion, and yields every validation error found.
+        :param root: The root element to validate.
+        :return: Generator of Page.Error records.
+        """
+        path = f"/{root.tag}"
+        if not isinstance(root, Html):
+            yield Page.Error(path, root.tag, "root", "the root element must be <html>")
+        yield from self._node_errors(root, path)
+        if self._consumed(root):
+            return
+        # Hijos pendientes de los elementos abiertos: (ruta del padre, iterador)
+        pending = [(path, enumerate(root.content))]
+        while pending:
+            parent_path, children = pending[-1]
+            for index, node in children:
+                if isinstance(node, Elem):
+                    path = f"{parent_path}/{node.tag}[{index}]"
+                    yield from self._node_errors(node, path)
+                    if not self._consumed(node):
+                        pending.append((path, enumerate(node.content)))
+                    break
+            else:
+                pending.pop()
 
+    def _check_tree(self, root: Elem) -> bool:
+        """
+        Validates a tree reusing the verdicts cached on its elements.
+        Elements whose verdict is unknown check the rule of their tag
+        on the same children that are walked, pulling their content
+        once; only the children that are not known to be valid or
+        invalid are visited, with an explicit stack instead of recursion.
+        :param root: The root element to validate.
+        :return: True if the tree is valid, False otherwise.
+        """
+        # Elementos abiertos: [elemento, iterador de hijos, todos válidos, regla, cuentas]
+        # La regla es None si ya se sabe que el elemento la cumple
+        pending = []
+        node, valid = root, None
+        while True:
+            if valid is None:
+                verdict = node._verdict
+                if verdict is not VALID and verdict is not INVALID and self._consumed(node):
+                    # Sus hijos ya no se pueden recorrer
+                    valid = False
+                elif verdict is None:
+                    rule = Page.RULES.get(node.tag)
+                    if rule is None:
+                        node._verdict = INVALID
+                        valid = False
+                    else:
+                        pending.append([node, iter(node.content), True, rule, {}])
+                elif verdict is CHANGED_CHILD:
+                    pending.append([node, iter(node.content), True, None, None])
+                else:
+                    valid = verdict is VALID
+            if valid is not None:
+                if not pending:
+                    return valid
+                pending[-1][2] = pending[-1][2] and valid
+            frame = pending[-1]
+            rule, counts = frame[3], frame[4]
+            broken = False
+            for child in frame[1]:
+                if rule is not None and self._breaks(rule, counts, self._count_child(counts, child)):
+                    broken = True
+                    break
+                if isinstance(child, Elem):
+                    node, valid = child, None
+                    break
+            else:
+                # Todos los hijos recorridos: el resto de la regla sale de sus cuentas
+                pending.pop()
+                node, valid = frame[0], frame[2]
+                if rule is not None and next(self._violations(node, rule, counts), None) is not None:
+                    node._verdict, valid = INVALID, False
+                else:
+                    node._verdict = VALID if valid else INVALID_CHILD
+            if broken:
+                pending.pop()
+                node, valid = frame[0], False
+                node._verdict = INVALID
+
+    def _node_errors(self, elem, path):
+        """
+        Yields the validation errors of a single element.
+        """
+        rule = Page.RULES.get(elem.tag)
+        if rule is None:
+            yield Page.Error(path, elem.tag, "tag", f"<{elem.tag}> is not an allowed tag")
+            return
+        if self._consumed(elem):
+            yield Page.Error(path, elem.tag, "content", "the lazy content has already been consumed")
+            return
+        for name, detail in self._violations(elem, rule):
+            yield Page.Error(path, elem.tag, name, detail)
+
+    @staticmethod
+    def _consumed(elem):
+        """
+        Tells whether the content of an element is a one-shot lazy
+        content already streamed, whose children can't be walked again.
+        """
+        content = elem.content
+        return isinstance(content, LazyContent) and content.consumed and content.items is None
+
+    @staticmethod
+    def _count_child(counts, child):
+        """
+        Counts a child by type. Texts are counted under Text and
+        invalid children under None.
+        :param counts: (dict) Number of children per type, updated.
+        :param child: The child to count.
+        :return: The type the child is counted under.
+        """
+        kind = type(child)
+        if kind not in counts and not isinstance(child, Elem):
+            kind = Text if isinstance(child, Text) else None
+        counts[kind] = counts.get(kind, 0) + 1
+        return kind
+
+    @staticmethod
+    def _breaks(rule, counts, kind):
+        """
+        Tells whether the last child counted, of type kind, already
+        breaks the rule, whatever the children that follow it.
+        """
+        if kind is Text:
+            return rule.exact
+        return (kind is None or kind not in rule.allowed
+                or rule.exclusive and len(counts) - (Text in counts) > 1)
+
+    @staticmethod
+    def _classify_children(elem):
+        """
+        Walks the children of an element once and counts them by type.
+        :param elem: The element whose children are classified.
+        :return: (dict) Number of children per type, as counted by
+        _count_child().
+        """
+        counts = {}
         for child in elem.content:
-            if isinstance(child, Elem):
-                # print(f"  ├── Validating child <{child.tag}> of <{elem.tag}>...")
-                if not self._validate_tree(child):
-                    # print(f"Validation failed: Child <{child.tag}> of <{elem.tag}> is invalid")
-                    return False
-        return True
-
-    def _check_children(self, elem, allowed, exact=False, exclusive=False, minimum=0):
-        """
-        Validates the children of an element based on allowed types and constraints.
-        :param elem: The element whose children are being validated.
-        :param allowed: List of allowed child element types.
-        :param exact: If True, only allowed elements are permitted.
-        :param exclusive: If True, all children must be of the same type.
-        :param minimum: Minimum number of required children.
-        :return: True if children are valid, False otherwise.
-        """
-        if len(elem.content) < minimum:
-            return False
-        if exclusive and len(set(type(child) for child in elem.content if isinstance(child, Elem))) > 1:
-            return False
-        return all(
-            isinstance(child, (Elem, Text)) and (not isinstance(child, Elem) or type(child) in allowed)
-            for child in elem.content
-        )
+            Page._count_child(counts, child)
+        return counts
+
+    def _violations(self, elem, rule, counts=None):
+        """
+        Yields the rules broken by the children of an element, as
+        (rule name, detail) pairs. Every constraint is answered from
+        a single classification pass.
+        :param counts: Counts of the children, as returned by
+        _classify_children(). They are computed if None, and consumed.
+        """
+        if counts is None:
+            counts = self._classify_children(elem)
+        total = sum(counts.values())
+        if total < rule.minimum:
+            yield "minimum", f"needs at least {rule.minimum} children, has {total}"
+        texts = counts.pop(Text, 0)
+        if counts.pop(None, 0):
+            yield "content", "contains items that are neither Elem nor Text"
+        if texts and rule.exact:
+            yield "exact", "cannot contain text"
+        if rule.exclusive and len(counts) > 1:
+            yield "exclusive", "children must all be of the same type"
+        for kind in counts:
+            if kind not in rule.allowed:
+                yield "allowed", f"{kind.__name__} is not allowed inside <{elem.tag}>"
+        for cls, count in rule.counted:
+            found = sum(number for kind, number in counts.items() if issubclass(kind, cls))
+            if found != count:
+                yield "count", f"needs exactly {count} <{cls.tag}>, has {found}"
+
+    def _checked_children(self, elem, children, path, paths):
+        """
+        Classifies the children of an element as they are pulled by the
+        serializer, and stops at the first one that breaks the rule of
+        the element. The rest of the rule is checked once all of them
+        have been written.
+        :param elem: The element whose children are pulled.
+        :param children: Iterator of the children.
+        :param path: Path of the element.
+        :param paths: One-item list where the path of the next element
+        to visit is left.
+        :return: Generator of the children.
+        """
+        rule = Page.RULES.get(elem.tag)
+        if rule is None:
+            raise Page._Abort(Page.Error(path, elem.tag, "tag", f"<{elem.tag}> is not an allowed tag"))
+        counts = {}
+        for index, child in enumerate(children):
+            kind = self._count_child(counts, child)
+            if self._breaks(rule, counts, kind):
+                break
+            if kind is not Text:
+                paths[0] = f"{path}/{child.tag}[{index}]"
+            yield child
+        name_detail = next(self._violations(elem, rule, counts), None)
+        if name_detail is not None:
+            raise Page._Abort(Page.Error(path, elem.tag, *name_detail))
+        # Todos sus hijos se han validado ya en este recorrido
+        elem._verdict = VALID
 
     def __str__(self) -> str:
         """
@@ -134,13 +314,96 @@ class Page:
         """
         return f"<!DOCTYPE html>\n{self.root}" if isinstance(self.root, Html) else str(self.root)
 
-    def write_to_file(self, filename: str):
+    def render_validated(self, filename: str, buffer_size=BUFFER_SIZE, compresslevel=9) -> list:
+        """
+        Validates the HTML document while writing it to a file, in a
+        single traversal. Lazy content is checked as it is written,
+        without being kept in memory. The file is written as in
+        write_to_file(), so at the first error the writing stops and
+        the file is left untouched.
+        :param filename: The name of the file to write to.
+        :param buffer_size: (int) Size of the write buffer, in bytes.
+        :param compresslevel: (int) gzip level, for .gz files.
+        :return: (list) Empty if the file was written, or the first
+        Page.Error record found.
+        """
+        root = self.root
+        if not isinstance(root, Html):
+            return [Page.Error(f"/{root.tag}", root.tag, "root", "the root element must be <html>")]
+        paths = [f"/{root.tag}"]  # Ruta del próximo elemento visitado
+
+        def visit(elem, children):
+            return self._checked_children(elem, children, paths[0], paths)
+
+        try:
+            with self._open_atomic(filename, buffer_size, compresslevel) as file:
+                write = file.write
+                write("<!DOCTYPE html>\n")
+                for fragment in root.iter_html(visit):
+                    write(fragment)
+        except Page._Abort as e:
+            return [e.error]
+        return []
+
+    def write_to_file(self, filename: str, buffer_size=BUFFER_SIZE, compresslevel=9):
         """
         Writes the HTML content to a file.
+        The document goes to a temporary file next to it, renamed over
+        filename once complete, so the file is never seen half written.
+        Files ending in .gz (such as page.html.gz) are gzip-compressed.
         :param filename: The name of the file to write to.
+        :param buffer_size: (int) Size of the write buffer, in bytes.
+        :param compresslevel: (int) gzip level from 0 to 9, for .gz files.
         """
-        with open(filename, "w") as file:
-            file.write(str(self))
+        with self._open_atomic(filename, buffer_size, compresslevel) as file:
+            # Escribir el documento por fragmentos, sin construirlo entero en memoria
+            if isinstance(self.root, Html):
+                file.write("<!DOCTYPE html>\n")
+            self.root.write_to(file)
+
+    @staticmethod
+    @contextmanager
+    def _open_atomic(filename, buffer_size, compresslevel):
+        """
+        Opens a temporary text file next to filename, and renames it
+        over filename if the block ends without errors (or removes it
+        otherwise). Files ending in .gz are gzip-compressed.
+        """
+        folder = os.path.dirname(os.path.abspath(filename))
+        prefix = os.path.join(folder, "." + os.path.basename(filename))
+        # Creado como open() crearía el archivo: 0o666 menos la umask del proceso
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        while True:
+            temporary = f"{prefix}.{os.urandom(6).hex()}.tmp"
+            try:
+                descriptor = os.open(temporary, flags, 0o666)
+                break
+            except FileExistsError:
+                continue
+        try:
+            if os.path.exists(filename):
+                os.chmod(temporary, os.stat(filename).st_mode & 0o7777)
+            with open(descriptor, "wb", buffering=buffer_size) as raw:
+                descriptor = None
+                stream = raw
+                if filename.endswith(".gz"):
+                    stream = gzip.GzipFile(os.path.basename(filename)[:-3], "wb", compresslevel, raw)
+                file = io.TextIOWrapper(stream)
+                try:
+                    yield file
+                finally:
+                    file.detach()  # Vacía el texto sin cerrar el archivo
+                    if stream is not raw:
+                        stream.close()
+                # Los datos deben estar en disco antes de sustituir el archivo
+                raw.flush()
+                os.fsync(raw.fileno())
+            os.replace(temporary, filename)
+        except BaseException:
+            if descriptor is not None:
+                os.close(descriptor)
+            os.remove(temporary)
+            raise
 
 
 def test():
@@ -194,6 +457,124 @@ def test():
     print("Passed: Hierarchy errors detected correctly.")
     print(invalid_page)
 
+    # Caso 4: Página muy profunda, más allá del límite de recursión
+    print("\n" + "-" * 50)
+    print("[TEST 4] Deep Page (Beyond The Recursion Limit)")
+    print("-" * 50)
+    innermost = deep = Div(P(Text("Deep content")))
+    for _ in range(5000):
+        deep = Div(deep)
+    deep_page = Page(Html([Head(Title(Text("Deep"))), Body(deep)]))
+    assert deep_page.is_valid(), "Test failed: Deep page should be valid."
+    innermost.add_content(Li(Text("Misplaced")))  # <li> dentro de <div>
+    assert not deep_page.is_valid(), "Test failed: Deep page with a misplaced <li> should be rejected."
+    print("Passed: Deep structure validated without recursion.")
+
+    # Caso 5: Informe detallado de errores
+    print("\n" + "-" * 50)
+    print("[TEST 5] Validation Report")
+    print("-" * 50)
+    assert valid_page.validate("all") == [], "Test failed: Valid page should have no errors."
+    errors = invalid_page.validate("all")
+    for error in errors:
+        print(error)
+    assert [(e.path, e.rule) for e in errors] == [
+        ("/html/body[1]/p[0]", "allowed"),
+        ("/html/body[1]/table[1]/tr[0]", "exclusive"),
+        ("/html/body[1]/ul[2]", "minimum"),
+    ], "Test failed: Every error should be reported in document order."
+    assert invalid_page.validate("first") == errors[:1], "Test failed: First mode should stop at the first error."
+    print("Passed: Errors reported with their path and rule.")
+
+    # Caso 6: Validación incremental después de editar la página
+    print("\n" + "-" * 50)
+    print("[TEST 6] Incremental Validation After Edits")
+    print("-" * 50)
+    head, items = Head(Title(Text("Edits"))), Ul(Li(Text("First")))
+    table = Table([Tr(Td(Text(str(i)))) for i in range(1000)])
+    edited_page = Page(Html([head, Body([items, table])]))
+    assert edited_page.is_valid(), "Test failed: Page should be valid before the edits."
+    items.add_content(Li(Text("Second")))
+    assert edited_page.is_valid(), "Test failed: Adding a <li> to a list should keep the page valid."
+    assert table.content[0]._verdict is VALID, "Test failed: Unchanged subtrees should keep their verdict."
+    head.add_content(Title(Text("Again")))  # Segundo <title> dentro de <head>
+    assert not edited_page.is_valid(), "Test failed: A second <title> should be rejected."
+    items.add_content(Div())  # <div> dentro de <ul>
+    assert not edited_page.is_valid(), "Test failed: A <div> inside a list should be rejected."
+    print("Passed: Only the edited elements were validated again.")
+
+    # Caso 7: Contenido perezoso, extraído al validar y al escribir
+    print("\n" + "-" * 50)
+    print("[TEST 7] Lazy Content")
+    print("-" * 50)
+
+    def rows():
+        for i in range(1000):
+            yield Tr([Td(Text(str(i))), Td(Text(str(i * i)))])
+    lazy_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(LazyContent(rows)))]))
+    eager_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(list(rows())))]))
+    assert lazy_page.is_valid(), "Test failed: Lazy rows should be validated."
+    assert str(lazy_page) == str(eager_page), "Test failed: Lazy rows should render like a list."
+    pulls = []
+
+    def counted_rows():
+        pulls.append(1)
+        return rows()
+    lazy_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(LazyContent(counted_rows)))]))
+    assert lazy_page.is_valid() and len(pulls) == 1, "Test failed: Lazy rows should be pulled once."
+    lazy_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(LazyContent(rows())))]))
+    assert lazy_page.is_valid(), "Test failed: A generator of rows should be validated."
+    assert str(lazy_page) == str(eager_page), "Test failed: A validated generator should still be rendered."
+    lazy_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(LazyContent(rows())))]))
+    str(lazy_page)
+    assert not lazy_page.is_valid(), "Test failed: A streamed generator can't be validated."
+    assert [(e.path, e.rule) for e in lazy_page.validate("all")] == [("/html/body[1]/table[0]", "content")], \
+        "Test failed: A streamed generator should be reported."
+    print("Passed: Lazy rows validated and rendered.")
+
+    # Caso 8: Validación y escritura en un único recorrido
+    print("\n" + "-" * 50)
+    print("[TEST 8] Validated Rendering")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, "page.html")
+        lazy_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(LazyContent(rows())))]))
+        assert lazy_page.render_validated(filename) == [], "Test failed: Valid page should be written."
+        with open(filename) as file:
+            assert file.read() == str(eager_page), "Test failed: Written page should match its HTML."
+
+        def bad_rows():
+            yield from rows()
+            yield Tr([Th(Text("Header")), Td(Text("Data"))])  # Mezcla <th> and <td>
+        lazy_page = Page(Html([Head(Title(Text("Lazy"))), Body(Table(LazyContent(bad_rows())))]))
+        errors = lazy_page.render_validated(filename)
+        assert [(e.path, e.rule) for e in errors] == [("/html/body[1]/table[0]/tr[1000]", "exclusive")], \
+            "Test failed: Rendering should stop at the first error."
+        with open(filename) as file:
+            assert file.read() == str(eager_page), "Test failed: The previous file should be left untouched."
+        assert os.listdir(folder) == ["page.html"], "Test failed: The partial file should be removed."
+    print("Passed: Page validated while written, partial file removed.")
+
+    # Caso 9: Escritura atómica y comprimida
+    print("\n" + "-" * 50)
+    print("[TEST 9] Atomic And Compressed Files")
+    print("-" * 50)
+    with tempfile.TemporaryDirectory() as folder:
+        filename = os.path.join(folder, "page.html.gz")
+        eager_page.write_to_file(filename, buffer_size=1 << 12, compresslevel=1)
+        with gzip.open(filename, "rt") as file:
+            assert file.read() == str(eager_page), "Test failed: The .gz file should hold the page."
+        broken_page = Page(Html([Head(Title(Text("Broken"))), Body(Div(LazyContent([P(), "str"])))]))
+        try:
+            broken_page.write_to_file(filename)
+            raise AssertionError("Test failed: Invalid content should stop the writing.")
+        except Elem.ValidationError:
+            pass
+        with gzip.open(filename, "rt") as file:
+            assert file.read() == str(eager_page), "Test failed: A failed write should keep the old file."
+        assert os.listdir(folder) == ["page.html.gz"], "Test failed: The temporary file should be removed."
+    print("Passed: Files replaced atomically, .gz files compressed.")
+
     # Generación de archivos HTML (válido e inválido)
     print("\n" + "-" * 50)
     print("[GENERATING HTML FILES]")
@@ -0,0 +1,224 @@
+import os
+import sys
+import json
+import time
+import timeit
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from elem import Elem, Text
+from elements import Html, Head, Body, Title, Img, Table, Tr, Th, Td, Ul, Li, H1, H2, P, Div, Span, Hr
+from Page import Page
+from page_parser import parse_string
+
+
+# Página válida del repositorio, base de la carga "real_page"
+VALID_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "valid_page.html")
+
+
+def wide_table(size: int) -> Page:
+    """
+    Page with a table of size rows and 4 columns.
+    """
+    header = Tr([Th(Text(f"Column {column}")) for column in range(4)])
+    rows = [Tr([Td(Text(f"{row}:{column}")) for column in range(4)]) for row in range(size)]
+    return Page(Html([Head(Title(Text("Wide table"))), Body(Table([header] + rows))]))
+
+
+def deep_divs(size: int) -> Page:
+    """
+    Page with size nested <div> elements around a paragraph.
+    """
+    deep = Div(P(Text("Deep content")))
+    for _ in range(size - 1):
+        deep = Div(deep)
+    return Page(Html([Head(Title(Text("Deep divs"))), Body(deep)]))
+
+
+def text_heavy(size: int) -> Page:
+    """
+    Page with size paragraphs of long text, with characters to escape.
+    """
+    text = 'Lorem "ipsum" dolor sit amet, <consectetur> & adipiscing elit.\n' * 8
+    paragraphs = [P(Text(f"{index}: {text}")) for index in range(size)]
+    return Page(Html([Head(Title(Text("Text heavy"))), Body([H1(Text("Text")), *paragraphs])]))
+
+
+def mixed(size: int) -> Page:
+    """
+    Page with size sections mixing headings, lists, tables and images.
+    """
+    sections = []
+    for index in range(size):
+        sections.append(Div([
+            H2(Text(f"Section {index}")),
+            P(Text("Some text for this section.")),
+            Ul([Li(Text(f"Item {item}")) for item in range(3)]),
+            Table([Tr([Th(Text("Key")), Th(Text("Value"))]), Tr([Td(Text("id")), Td(Text(index))])]),
+            Span(P(Text("Aside"))),
+        ]))
+        sections.append(Hr({"class": "separator"}))
+    body = Body([H1(Text("Mixed")), Img({"src": "logo.png", "alt": "Logo"}), *sections])
+    return Page(Html([Head(Title(Text("Mixed page"))), body]))
+
+
+def real_page(size: int) -> Page:
+    """
+    Page parsed from the repository's valid_page.html, with the content
+    of its body repeated size times.
+    """
+    with open(VALID_PAGE) as file:
+        html = file.read()
+    start = html.index("<body>") + len("<body>")
+    end = html.rindex("</body>")
+    return Page(parse_string(html[:start] + html[start:end] * size + html[end:]))
+
+
+# Páginas de prueba, construidas para un tamaño dado
+WORKLOADS = {
+    "wide_table": wide_table,
+    "deep_divs": deep_divs,
+    "text_heavy": text_heavy,
+    "mixed": mixed,
+    "real_page": real_page,
+}
+
+
+def count_nodes(root: Elem) -> int:
+    """
+    Counts the elements and texts of a tree, without recursion.
+    """
+    count, pending = 0, [root]
+    while pending:
+        node = pending.pop()
+        count += 1
+        if isinstance(node, Elem):
+            pending.extend(node.content)
+    return count
+
+
+def commit_id():
+    """
+    Returns the id of the git commit the benchmark runs on, or None
+    outside of a git repository.
+    """
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def _operations(folder):
+    """
+    Operations measured on every page. Each one runs on a freshly built
+    page, so the render and validation caches start empty.
+    """
+    filename = os.path.join(folder, "page.html")
+    return {
+        "str": lambda page: str(page.root),
+        "is_valid": lambda page: page.is_valid(),
+        "write_to_file": lambda page: page.write_to_file(filename),
+    }
+
+
+def measure(workload: str, size: int, operation: str, run, repeat: int) -> dict:
+    """
+    Measures one operation on one page size.
+    :param workload: Name of the page builder in WORKLOADS.
+    :param size: Size given to the page builder.
+    :param operation: Name of the operation.
+    :param run: Function running the operation on a page.
+    :param repeat: (int) Number of timed runs; the best one is kept.
+    :return: (dict) Result record with the time, throughput and peak memory.
+    """
+    build = WORKLOADS[workload]
+    pages = []
+    # Una página nueva por repetición, construida fuera del tiempo medido
+    timer = timeit.Timer(lambda: run(pages.pop()), setup=lambda: pages.append(build(size)))
+    seconds = min(timer.repeat(repeat=repeat, number=1))
+
+    page = build(size)
+    nodes = count_nodes(page.root)
+    tracemalloc.start()
+    try:
+        run(page)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        "workload": workload,
+        "size": size,
+        "operation": operation,
+        "nodes": nodes,
+        "seconds": seconds,
+        "nodes_per_second": nodes / seconds if seconds else None,
+        "peak_memory_kib": peak / 1024,
+    }
+
+
+def run_benchmarks(sizes, repeat=3, workloads=None, operations=None):
+    """
+    Runs every operation on every workload, for each size.
+    :param sizes: Iterable of page sizes, giving the scaling curves.
+    :param repeat: (int) Number of timed runs per measure.
+    :param workloads: Names of the workloads to run (all if None).
+    :param operations: Names of the operations to run (all if None).
+    :return: Generator of result records.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        available = _operations(folder)
+        for workload in workloads or WORKLOADS:
+            for size in sizes:
+                for operation in operations or available:
+                    yield measure(workload, size, operation, available[operation], repeat)
+
+
+def main():
+    """
+    Main script function.
+    Runs the benchmarks, prints a table of the results and saves them
+    as JSON, along with the Python version, the platform and the git
+    commit they were measured on.
+    """
+    parser = argparse.ArgumentParser(usage="python benchmark.py [options]")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000],
+                        help="page sizes of the scaling curves")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per measure")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), action="append",
+                        help="workload to run (all by default, can be repeated)")
+    parser.add_argument("--operation", choices=("str", "is_valid", "write_to_file"), action="append",
+                        help="operation to measure (all by default, can be repeated)")
+    parser.add_argument("--output", default="benchmark.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    if args.repeat < 1 or min(args.sizes) < 1:
+        print("Error: Sizes and repetitions must be at least 1.", file=sys.stderr)
+        sys.exit(1)
+
+    results = []
+    print(f"{'workload':<12} {'size':>7} {'operation':<14} {'nodes':>8} "
+          f"{'seconds':>10} {'nodes/s':>12} {'peak KiB':>10}")
+    for result in run_benchmarks(args.sizes, args.repeat, args.workload, args.operation):
+        results.append(result)
+        print(f"{result['workload']:<12} {result['size']:>7} {result['operation']:<14} "
+              f"{result['nodes']:>8} {result['seconds']:>10.5f} "
+              f"{result['nodes_per_second'] or 0:>12.0f} {result['peak_memory_kib']:>10.1f}")
+
+    with open(args.output, "w") as file:
+        json.dump({
+            "commit": commit_id(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "repeat": args.repeat,
+            "results": results,
+        }, file, indent=2)
+    print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
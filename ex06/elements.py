@@ -1,210 +1,235 @@
-from elem import Elem, Text
+from elem import Elem, Text, NodeStore
 
 
 # Clases estructurales
 class Html(Elem):
     """Class representing the <html> tag."""
+    __slots__ = ()
+    tag = 'html'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='html',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Head(Elem):
     """Class representing the <head> tag."""
+    __slots__ = ()
+    tag = 'head'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='head',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Body(Elem):
     """Class representing the <body> tag."""
+    __slots__ = ()
+    tag = 'body'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='body',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 # Clases de cabecera y metaetiquetas
 class Title(Elem):
     """Class representing the <title> tag."""
+    __slots__ = ()
+    tag = 'title'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='title',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Meta(Elem):
     """Class representing the <meta> tag."""
+    __slots__ = ()
+    tag = 'meta'
+    tag_type = 'simple'
+
     def __init__(self, attr=None):
-        super().__init__(tag='meta', attr=attr or {}, tag_type='simple')
+        super().__init__(attr=attr)
 
 
 # Clases multimedia
 class Img(Elem):
     """Class representing the <table> tag."""
+    __slots__ = ()
+    tag = 'img'
+    tag_type = 'simple'
+
     def __init__(self, attr=None):
-        super().__init__(tag='img', attr=attr or {}, tag_type='simple')
+        super().__init__(attr=attr)
 
 
 # Clases para tablas
 class Table(Elem):
     """Class representing the <table> tag."""
+    __slots__ = ()
+    tag = 'table'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='table',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
+
+    @classmethod
+    def from_rows(cls, rows, header=None, attr=None):
+        """
+        Builds a table from an iterable of rows, keeping its rows and
+        cells in a flat NodeStore instead of one Tr, Td and Text object
+        per row and cell. It renders the same HTML as the Elem tree.
+        :param rows: Iterable of rows, each one an iterable of cell values.
+        :param header: Optional sequence of values for a first row of <th>.
+        :param attr: Attributes of the <table> tag.
+        :return: (Table) The new table.
+        """
+        store = NodeStore()
+        add_elem, add_text = store.add_elem, store.add_text
+        if header is not None:
+            row = add_elem(Tr)
+            for value in header:
+                add_text(value, add_elem(Th, parent=row))
+        for cells in rows:
+            row = add_elem(Tr)
+            for value in cells:
+                add_text(value, add_elem(Td, parent=row))
+        table = cls(attr=attr)
+        table.content = store
+        return table
 
 
 class Th(Elem):
     """Class representing the <th> tag."""
+    __slots__ = ()
+    tag = 'th'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='th',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Tr(Elem):
     """Class representing the <tr> tag."""
+    __slots__ = ()
+    tag = 'tr'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='tr',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Td(Elem):
     """Class representing the <td> tag."""
+    __slots__ = ()
+    tag = 'td'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='td',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 # Clases de lista
 class Ul(Elem):
     """Class representing the <ul> tag."""
+    __slots__ = ()
+    tag = 'ul'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='ul',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Ol(Elem):
     """Class representing the <ol> tag."""
+    __slots__ = ()
+    tag = 'ol'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='ol',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Li(Elem):
     """Class representing the <li> tag."""
+    __slots__ = ()
+    tag = 'li'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='li',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 # Clases varias
 class H1(Elem):
     """Class representing the <h1> tag."""
+    __slots__ = ()
+    tag = 'h1'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='h1',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class H2(Elem):
     """Class representing the <h2> tag."""
+    __slots__ = ()
+    tag = 'h2'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='h2',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class P(Elem):
     """Class representing the <p> tag."""
+    __slots__ = ()
+    tag = 'p'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='p',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Div(Elem):
     """Class representing the <div> tag."""
+    __slots__ = ()
+    tag = 'div'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='div',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Span(Elem):
     """Class representing the <span> tag."""
+    __slots__ = ()
+    tag = 'span'
+    tag_type = 'double'
+
     def __init__(self, content=None, attr=None):
-        super().__init__(
-            tag='span',
-            attr=attr or {},
-            content=content,
-            tag_type='double'
-        )
+        super().__init__(attr=attr, content=content)
 
 
 class Hr(Elem):
     """Class representing the <hr> tag."""
+    __slots__ = ()
+    tag = 'hr'
+    tag_type = 'simple'
+
     def __init__(self, attr=None):
-        super().__init__(tag='hr', attr=attr or {}, tag_type='simple')
+        super().__init__(attr=attr)
 
 
 class Br(Elem):
     """Class representing the <br> tag."""
+    __slots__ = ()
+    tag = 'br'
+    tag_type = 'simple'
+
     def __init__(self, attr=None):
-        super().__init__(tag='br', attr=attr or {}, tag_type='simple')
+        super().__init__(attr=attr)
 
 
 # Test
@@ -0,0 +1,285 @@
+import gzip
+from html.parser import HTMLParser
+from itertools import islice
+from elem import Elem, Text, VALID
+from elements import Html, Head, Body, Title, Meta, Img, Table, Th, Tr, Td, Ul, Ol, Li, H1, H2, P, Div, Span, Hr, Br
+from Page import Page
+
+
+class PageParser(HTMLParser):
+    """
+    Parser that builds a tree of elements.py classes from HTML, such
+    as the files written by Page.write_to_file. It can also validate
+    the document with the Page rules while parsing, and stop at the
+    first violation without reading the rest of the input.
+    """
+
+    # Clases de elements.py asociadas a cada etiqueta HTML
+    TAGS = {cls.tag: cls for cls in (Html, Head, Body, Title, Meta, Img, Table, Th, Tr, Td,
+                                     Ul, Ol, Li, H1, H2, P, Div, Span, Hr, Br)}
+
+    # Etiquetas HTML sin contenido ni etiqueta de cierre, aunque no lleven "/>"
+    VOID = frozenset({"area", "base", "br", "col", "embed", "hr", "img", "input",
+                      "link", "meta", "param", "source", "track", "wbr"})
+
+    # Tamaño de los bloques leídos de un archivo
+    CHUNK_SIZE = 1 << 16
+
+    class ParseError(Exception):
+        """
+        Exception raised when the HTML is not well formed.
+        """
+        pass
+
+    class InvalidPage(ParseError):
+        """
+        Exception raised when the HTML breaks a Page rule.
+        The broken rule is available as a Page.Error record.
+        """
+
+        def __init__(self, error):
+            super().__init__(f"{error.path}: {error.detail}")
+            self.error = error
+
+    def __init__(self, validate=False):
+        """
+        Initializes the parser.
+        :param validate: If True, checks the Page rules while parsing
+        and raises PageParser.InvalidPage at the first violation.
+        """
+        super().__init__(convert_charrefs=True)
+        self.validate = validate
+        self.root = None
+        self.count = 0  # Elementos construidos
+        self._page = None
+        self._path = None
+        # Elementos abiertos: [elemento, ruta, hijos, texto seguido de <br />]
+        self._open = []
+
+    def feed_file(self, filename: str):
+        """
+        Feeds the content of a file to the parser, by chunks.
+        Files ending in .gz are decompressed as they are read.
+        :param filename: The name of the file to read.
+        """
+        opener = gzip.open if filename.endswith(".gz") else open
+        with opener(filename, "rt") as file:
+            for chunk in iter(lambda: file.read(PageParser.CHUNK_SIZE), ""):
+                self.feed(chunk)
+
+    def result(self) -> Elem:
+        """
+        Finishes the parsing and returns the root element.
+        :return: The root element of the document.
+        """
+        self.close()
+        if self._open:
+            raise PageParser.ParseError(f"<{self._open[-1][0].tag}> is never closed")
+        if self.root is None:
+            raise PageParser.ParseError("the document has no root element")
+        return self.root
+
+    def handle_starttag(self, tag, attrs):
+        if tag in PageParser.VOID:
+            self.handle_startendtag(tag, attrs)
+            return
+        elem = self._start(tag, attrs, simple=False)
+        if elem.tag_type == "double":
+            self._open.append([elem, self._path, [], False])
+        else:
+            self._end(elem, self._path, [])
+
+    def handle_startendtag(self, tag, attrs):
+        frame = self._open[-1] if self._open else None
+        # Los saltos de línea de un Text se escriben como <br />
+        if tag == "br" and not attrs and frame:
+            children = frame[2]
+            if children and isinstance(children[-1], Text):
+                children[-1] = Text(children[-1] + "\n")
+                frame[3] = True
+                return
+            # En las etiquetas de solo texto, empieza un Text con un salto de línea
+            rule = Page.RULES.get(frame[0].tag)
+            if rule is not None and not rule.allowed and not rule.exact:
+                children.append(Text("\n"))
+                frame[3] = True
+                return
+        self._end(self._start(tag, attrs, simple=True), self._path, [])
+
+    def handle_endtag(self, tag):
+        if not self._open or self._open[-1][0].tag != tag:
+            line, column = self.getpos()
+            raise PageParser.ParseError(f"unexpected </{tag}> at line {line}, column {column}")
+        elem, path, children, _ = self._open.pop()
+        self._end(elem, path, children)
+
+    def handle_data(self, data):
+        # Cada línea es un Text distinto: sus saltos de línea propios son <br />
+        for line in data.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            if not self._open:
+                raise PageParser.ParseError("text outside of the root element")
+            frame = self._open[-1]
+            if frame[3]:
+                frame[2][-1] = Text(frame[2][-1] + line)
+                frame[3] = False
+            else:
+                frame[2].append(Text(line))
+
+    def _start(self, tag, attrs, simple):
+        """
+        Creates the element of an opening tag and checks that it is
+        allowed where it appears.
+        """
+        if self._open:
+            parent, parent_path, children, _ = frame = self._open[-1]
+            frame[3] = False
+            self._path = f"{parent_path}/{tag}[{len(children)}]"
+        elif self.root is None:
+            parent = None
+            self._path = f"/{tag}"
+        else:
+            raise PageParser.ParseError(f"<{tag}> is outside of the root element")
+        attrs = {name: "" if value is None else value for name, value in attrs}
+        cls = PageParser.TAGS.get(tag)
+        if cls is not None:
+            elem = cls(attr=attrs)
+        else:
+            elem = Elem(tag, attrs, tag_type="simple" if simple else "double")
+        if self.validate:
+            if parent is None and cls is not Html:
+                self._fail(Page.Error(self._path, tag, "root", "the root element must be <html>"))
+            if cls is None:
+                self._fail(Page.Error(self._path, tag, "tag", f"<{tag}> is not an allowed tag"))
+            rule = parent is not None and Page.RULES.get(parent.tag)
+            if rule and cls not in rule.allowed:
+                self._fail(Page.Error(parent_path, parent.tag, "allowed",
+                                      f"{cls.__name__} is not allowed inside <{parent.tag}>"))
+        return elem
+
+    def _end(self, elem, path, children):
+        """
+        Adds the children of a closed element, validates it and adds
+        it to its parent. Children are added all at once, so that the
+        tree is built bottom-up.
+        """
+        if children:
+            elem.add_content(children)
+        self.count += 1
+        if self.validate:
+            if self._page is None:
+                self._page = Page(elem)
+            error = next(islice(self._page._node_errors(elem, path), 1), None)
+            if error is not None:
+                self._fail(error)
+            # Sus hijos ya se han validado: la página no necesita revisarlo otra vez
+            elem._verdict = VALID
+        if self._open:
+            self._open[-1][2].append(elem)
+            self._open[-1][3] = False
+        else:
+            self.root = elem
+
+    def _fail(self, error):
+        """
+        Stops the parsing at the first validation error.
+        """
+        self.reset()
+        self._open = []
+        raise PageParser.InvalidPage(error)
+
+
+def parse_string(html: str, validate=False) -> Elem:
+    """
+    Builds a tree of elements from an HTML string.
+    :param html: The HTML document.
+    :param validate: If True, raises PageParser.InvalidPage at the
+    first element that breaks a Page rule.
+    :return: The root element.
+    """
+    parser = PageParser(validate)
+    parser.feed(html)
+    return parser.result()
+
+
+def parse_file(filename: str, validate=False) -> Elem:
+    """
+    Builds a tree of elements from an HTML file, reading it by chunks.
+    :param filename: The name of the file to read.
+    :param validate: If True, raises PageParser.InvalidPage at the
+    first element that breaks a Page rule, without reading the rest.
+    :return: The root element.
+    """
+    parser = PageParser(validate)
+    parser.feed_file(filename)
+    return parser.result()
+
+
+def test():
+    """
+    Runs a minimal set of tests to validate the PageParser class.
+    """
+    print("\n" + "=" * 50)
+    print("TESTING PAGE PARSER")
+    print("=" * 50)
+
+    # Caso 1: El HTML generado se reconstruye con las mismas clases
+    print("\n" + "-" * 50)
+    print("[TEST 1] Round Trip")
+    print("-" * 50)
+    page = Page(Html([
+        Head([Meta({'charset': 'UTF-8'}), Title(Text('"Hello ground!"'))]),
+        Body([
+            H1(Text("Tom & Jerry <3")),
+            P(Text("First line\nSecond line")),
+            Table([Tr([Th(Text("Name")), Th(Text("Age"))]), Tr([Td(Text("Ann")), Td(Text("42"))])]),
+            Ul([Li(Text("one")), Li(Text("two"))]),
+            Img({'src': 'http://i.imgur.com/pfp3T.jpg'}),
+        ]),
+    ]))
+    root = parse_string(str(page), validate=True)
+    assert isinstance(root, Html) and isinstance(root.content[1].content[2], Table), \
+        "Test failed: Tags should be built with the elements.py classes."
+    assert str(Page(root)) == str(page), "Test failed: The parsed page should render the same HTML."
+    assert Page(root).is_valid(), "Test failed: The parsed page should be valid."
+    print("Passed: Parsed page renders the same HTML.")
+
+    # Caso 2: Validación durante el análisis
+    print("\n" + "-" * 50)
+    print("[TEST 2] Validation While Parsing")
+    print("-" * 50)
+    invalid = "<html><head><title>T</title></head><body><ul></ul><p><div></div></p></body></html>"
+    root = parse_string(invalid)
+    assert not Page(root).is_valid(), "Test failed: The invalid page should be parsed without validation."
+    try:
+        parse_string(invalid, validate=True)
+        raise AssertionError("Test failed: The invalid page should be rejected.")
+    except PageParser.InvalidPage as e:
+        assert (e.error.path, e.error.rule) == ("/html/body[1]/ul[0]", "minimum"), \
+            "Test failed: Parsing should stop at the first violation."
+    try:
+        parse_string("<html><body></div></html>")
+        raise AssertionError("Test failed: Mismatched tags should be rejected.")
+    except PageParser.ParseError as e:
+        assert not isinstance(e, PageParser.InvalidPage)
+    print("Passed: Violations and malformed HTML rejected.")
+
+    # Caso 3: Saltos de línea al principio de un texto y etiquetas vacías
+    print("\n" + "-" * 50)
+    print("[TEST 3] Leading Line Breaks And Void Tags")
+    print("-" * 50)
+    page = Page(Html([Head(Title(Text("T"))), Body([P(Text("\nlead")), P(Text("\n")), Br()])]))
+    root = parse_string(str(page), validate=True)
+    assert str(Page(root)) == str(page), "Test failed: A leading <br /> should be part of the text."
+    root = parse_string('<html><head><title>T</title><link rel="icon"><meta charset="UTF-8">'
+                        '</head><body><input type="text"><br></body></html>')
+    assert [child.tag for child in root.content[0].content] == ["title", "link", "meta"], \
+        "Test failed: Void tags should have no closing tag."
+    assert isinstance(root.content[1].content[1], Br), "Test failed: <br> should be a Br element."
+    print("Passed: Leading line breaks and void tags parsed.")
+
+
+if __name__ == "__main__":
+    test()
@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import json
+import zlib
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from elem import Elem
+from Page import Page
+from page_parser import PageParser
+
+
+def find_pages(directory: str):
+    """
+    Finds every .html (or .html.gz) file under a directory, in a
+    stable order.
+    :param directory: The directory to search.
+    :return: Generator of file paths.
+    """
+    for folder, subfolders, files in os.walk(directory):
+        subfolders.sort()
+        for name in sorted(files):
+            if name.endswith((".html", ".html.gz")):
+                yield os.path.join(folder, name)
+
+
+def validate_file(filename: str, mode="all") -> dict:
+    """
+    Parses an HTML file and validates it with the Page rules.
+    :param filename: The name of the file to validate.
+    :param mode: "all" to report every error, or "first" to stop
+    reading the file at the first one.
+    :return: (dict) Report record with the file name, its validity,
+    the number of elements parsed, the errors and the time spent.
+    """
+    start = time.perf_counter()
+    parser = PageParser(validate=mode == "first")
+    record = {"file": filename, "valid": False}
+    errors = []
+    try:
+        parser.feed_file(filename)
+        errors = Page(parser.result()).validate(mode)
+        record["valid"] = not errors
+    except PageParser.InvalidPage as e:
+        errors = [e.error]
+    except (PageParser.ParseError, Elem.ValidationError, OSError, EOFError, zlib.error,
+            UnicodeDecodeError) as e:
+        # Archivo ilegible (o .gz corrupto) o HTML mal formado: solo falla este archivo
+        record["failure"] = str(e)
+    record["nodes"] = parser.count
+    record["errors"] = [error._asdict() for error in errors]
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def _validate_chunk(chunk, mode):
+    """
+    Validates a list of files in a worker process.
+    """
+    return [validate_file(filename, mode) for filename in chunk]
+
+
+def validate_directory(directory: str, workers=None, chunksize=16, mode="all"):
+    """
+    Validates every page file under a directory across a pool of
+    processes. Records are produced in the order of find_pages().
+    :param directory: The directory to search.
+    :param workers: (int) Number of worker processes (CPU count if None).
+    With 1 worker the files are validated in this process.
+    :param chunksize: (int) Number of files sent to a worker at once.
+    :param mode: "all" or "first", as in validate_file().
+    :return: Generator of report records.
+    """
+    if chunksize < 1:
+        raise ValueError("The chunk size must be at least 1.")
+    if mode not in ("first", "all"):
+        raise ValueError('The mode must be "first" or "all".')
+    files = find_pages(directory)
+    chunks = iter(lambda: list(islice(files, chunksize)), [])
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from _validate_chunk(chunk, mode)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Limitar los trozos en vuelo, y entregarlos en orden
+        limit = 2 * workers
+        pending = deque()
+        for chunk in chunks:
+            if len(pending) >= limit:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_validate_chunk, chunk, mode))
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main():
+    """
+    Main script function.
+    Validates the .html files of a directory, writes a JSON Lines
+    report with one record per file, and prints a summary with the
+    throughput of the run.
+    """
+    parser = argparse.ArgumentParser(usage="python validate_pages.py [options] <directory>")
+    parser.add_argument("directory", help="directory holding the .html files")
+    parser.add_argument("--report", help="JSON Lines report file (standard output by default)")
+    parser.add_argument("--workers", type=int, help="number of worker processes")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="files sent to a worker at once")
+    parser.add_argument("--first", action="store_true",
+                        help="stop reading each file at its first error")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"Error: The directory {args.directory} does not exist.", file=sys.stderr)
+        sys.exit(1)
+
+    report = open(args.report, "w") if args.report else sys.stdout
+    files = valid = nodes = 0
+    start = time.perf_counter()
+    try:
+        for record in validate_directory(args.directory, args.workers, args.chunksize,
+                                         "first" if args.first else "all"):
+            report.write(json.dumps(record) + "\n")
+            files += 1
+            valid += record["valid"]
+            nodes += record["nodes"]
+    finally:
+        if report is not sys.stdout:
+            report.close()
+    elapsed = time.perf_counter() - start
+
+    # Resumen del rendimiento, aparte del informe
+    rate = 1 / elapsed if elapsed else 0.0
+    print(f"{files} files validated ({valid} valid, {files - valid} invalid), "
+          f"{nodes} nodes in {elapsed:.3f} s: "
+          f"{files * rate:.1f} files/s, {nodes * rate:.1f} nodes/s", file=sys.stderr)
+    sys.exit(0 if valid == files else 1)
+
+
+if __name__ == "__main__":
+    main()